@@ -1,16 +1,30 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import os
-from typing import Optional
+import threading
+import time
+from typing import List, Optional
 import uvicorn
 
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from modules.chatbot_core import APECChatbot
-from modules.utils import detect_language, get_context_suggestions
+from modules.utils import (
+    detect_language,
+    get_context_suggestions,
+    get_hardcoded_suggestions,
+    combine_suggestions,
+    start_llm_suggestions,
+    is_llm_suggestions_pending
+)
+from modules.coalescing import SingleFlight, normalize_question
 from modules.config import ChatbotConfig
+from modules.tracing import REQUEST_DURATION, REQUESTS, render_metrics
+from modules.worker_pool import WorkerPool, WorkerPoolSaturated, WorkerPoolTimeout
 
 app = FastAPI(
     title="APEC 2025 RAG Chatbot API",
@@ -27,15 +41,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Global chatbot instance
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and observe their latency (for streams, until the response starts)"""
+    if not ChatbotConfig.TRACING_ENABLED or request.url.path == "/metrics":
+        return await call_next(request)
+
+    start_time = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        # The matched route template, so unknown or parameterized paths cannot create unbounded series
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUEST_DURATION.observe(time.perf_counter() - start_time, endpoint=endpoint)
+        REQUESTS.inc(endpoint=endpoint, status=status)
+
+# Global chatbot instance, built in the background after startup (see warm_up_chatbot)
 chatbot = None
+startup_status = {"status": "warming", "started_at": None, "ready_after_seconds": None, "components": {}, "error": None}
+
+# Bounded pool for the blocking chatbot/LLM calls so the event loop stays responsive
+worker_pool = WorkerPool(
+    max_workers=ChatbotConfig.API_MAX_WORKERS,
+    max_queue=ChatbotConfig.API_MAX_QUEUE,
+    queue_timeout=ChatbotConfig.API_QUEUE_TIMEOUT
+)
+
+# Concurrent identical /chat requests (same normalized question, language, top_k, ...) share one answer
+chat_single_flight = SingleFlight("/chat")
 
 # Request/Response models
+class ChatFilters(BaseModel):
+    """Restrict retrieval to table chunks (or prose) and/or to pages by title, URL or URL prefix"""
+    contains_table: Optional[bool] = None
+    titles: Optional[List[str]] = None
+    urls: Optional[List[str]] = None
+    url_prefixes: Optional[List[str]] = None
+
 class ChatRequest(BaseModel):
     message: str
     auto_detect: bool = True
     preferred_language: str = "vi"
     top_k: int = 5
+    search_type: str = ChatbotConfig.DEFAULT_SEARCH_TYPE
+    filters: Optional[ChatFilters] = None
+    include_timing: bool = False
+
+    def get_filters(self):
+        return self.filters.model_dump(exclude_none=True) if self.filters else None
+
+    def coalescing_key(self):
+        """Requests with equal keys get the same answer, so concurrent ones can share one computation"""
+        language = "auto" if self.auto_detect else self.preferred_language
+        filters = json.dumps(self.get_filters(), sort_keys=True)
+        return (normalize_question(self.message), language, self.top_k, self.search_type, filters)
 
 class ChatResponse(BaseModel):
     answer: str
@@ -43,6 +106,16 @@ class ChatResponse(BaseModel):
     num_sources: int
     detected_language: str
     response_time: Optional[float] = None
+    timing: Optional[dict] = None
+    route: Optional[str] = None
+
+class BatchChatRequest(BaseModel):
+    requests: List[ChatRequest]
+    max_concurrency: Optional[int] = None
+
+class BatchChatResponse(BaseModel):
+    results: List[ChatResponse]
+    total_time: float
 
 class SuggestionsRequest(BaseModel):
     response_content: str
@@ -50,27 +123,117 @@ class SuggestionsRequest(BaseModel):
 
 class SuggestionsResponse(BaseModel):
     suggestions: list
+    pending: bool = False
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize the chatbot when the API starts"""
+def warm_up_chatbot():
+    """Build the chatbot off the event loop so the API accepts connections (and /health) right away"""
     global chatbot
+    start_time = time.perf_counter()
     try:
-        # Validate environment
-        is_valid, message = ChatbotConfig.validate()
-        if not is_valid:
-            raise Exception(f"Configuration error: {message}")
-        
-        # Initialize chatbot
-        chatbot = APECChatbot(
+        # Imported here: LangChain, Chroma and sentence-transformers load in the background too
+        from modules.chatbot_core import APECChatbot
+
+        instance = APECChatbot(
             api_key=ChatbotConfig.GOOGLE_API_KEY,
             persist_directory=ChatbotConfig.VECTOR_DB_PATH
         )
-        print("Chatbot initialized successfully")
+        chatbot = instance
+        startup_status.update(
+            status="ready",
+            ready_after_seconds=round(time.perf_counter() - start_time, 2),
+            components=instance.startup_timings
+        )
+        print(f"Chatbot initialized successfully in {startup_status['ready_after_seconds']}s")
         
     except Exception as e:
+        startup_status.update(status="failed", error=str(e))
         print(f"Failed to initialize chatbot: {str(e)}")
-        raise e
+
+@app.on_event("startup")
+async def startup_event():
+    """Validate the configuration and start warming up the chatbot in the background"""
+    # Validate environment
+    is_valid, message = ChatbotConfig.validate()
+    if not is_valid:
+        raise Exception(f"Configuration error: {message}")
+
+    startup_status["started_at"] = time.time()
+    threading.Thread(target=warm_up_chatbot, name="chatbot-warmup", daemon=True).start()
+
+def require_chatbot():
+    """Reject requests with 503 until the background warm-up has finished"""
+    if chatbot is None:
+        if startup_status["status"] == "failed":
+            raise HTTPException(status_code=503, detail=f"Chatbot failed to initialize: {startup_status['error']}")
+        raise HTTPException(status_code=503, detail="Chatbot is warming up, please retry shortly", headers={"Retry-After": "5"})
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the worker threads"""
+    worker_pool.shutdown()
+
+async def run_in_worker_pool(fn, *args, **kwargs):
+    """Run a blocking call on the worker pool, mapping saturation to 429/503 responses"""
+    try:
+        return await worker_pool.run(fn, *args, **kwargs)
+    except WorkerPoolSaturated:
+        raise HTTPException(status_code=429, detail="Server is busy, please retry shortly", headers={"Retry-After": "1"})
+    except WorkerPoolTimeout:
+        raise HTTPException(status_code=503, detail="Timed out waiting for a free worker", headers={"Retry-After": "5"})
+
+def check_search_type(search_type):
+    """Reject unknown search types before any work is queued"""
+    if search_type not in ChatbotConfig.SUPPORTED_SEARCH_TYPES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unsupported search_type '{search_type}', expected one of {ChatbotConfig.SUPPORTED_SEARCH_TYPES}"
+        )
+
+def format_sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def report_producer_error(task):
+    """Done callback retrieving a stream producer's exception so it is reported rather than lost"""
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Stream producer failed: {task.exception()}")
+
+async def stream_from_worker_pool(events_fn, *args, **kwargs):
+    """Consume a blocking event generator on the worker pool and yield its events asynchronously"""
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stopped = threading.Event()
+
+    def produce():
+        events = events_fn(*args, **kwargs)
+        try:
+            for event in events:
+                if stopped.is_set():
+                    break
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        finally:
+            # Closing the generator also closes the LLM stream it is reading from
+            events.close()
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    async def run_producer():
+        try:
+            await worker_pool.run(produce)
+        except (WorkerPoolSaturated, WorkerPoolTimeout) as e:
+            queue.put_nowait({"type": "error", "answer": f"Server is busy: {str(e)}"})
+            queue.put_nowait(None)
+
+    producer = asyncio.ensure_future(run_producer())
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+    finally:
+        # If the client disconnected, the worker stops at its next event and frees its slot
+        stopped.set()
+        producer.add_done_callback(report_producer_error)
 
 @app.get("/")
 async def root():
@@ -85,13 +248,28 @@ async def root():
 async def health_check():
     """Detailed health check"""
     if chatbot is None:
-        raise HTTPException(status_code=503, detail="Chatbot not initialized")
+        # Served immediately while the models load; 503 keeps load balancers from routing traffic yet
+        return JSONResponse(status_code=503, content={
+            "status": startup_status["status"],
+            "chatbot_ready": False,
+            "warming_for_seconds": round(time.time() - startup_status["started_at"], 1) if startup_status["started_at"] else None,
+            "error": startup_status["error"]
+        })
     
     return {
         "status": "healthy",
         "chatbot_ready": chatbot.is_ready(),
+        "startup": startup_status,
         "vector_store_count": chatbot.get_collection_count(),
-        "supported_languages": ChatbotConfig.SUPPORTED_LANGUAGES
+        "supported_languages": ChatbotConfig.SUPPORTED_LANGUAGES,
+        "worker_pool": worker_pool.stats(),
+        "semantic_cache": chatbot.semantic_cache.stats() if chatbot.semantic_cache else None,
+        "query_embedding_cache": chatbot.query_embedding_cache.stats() if chatbot.query_embedding_cache else None,
+        "embedding_batcher": chatbot.embedding_batcher.stats() if chatbot.embedding_batcher else None,
+        "reranker": chatbot.reranker.stats() if chatbot.reranker else None,
+        "context_builder": chatbot.context_builder.stats() if chatbot.context_builder else None,
+        "table_router": chatbot.table_router.stats() if chatbot.table_router else None,
+        "request_coalescing": chat_single_flight.stats()
     }
 
 @app.post("/chat", response_model=ChatResponse)
@@ -100,20 +278,33 @@ async def chat_endpoint(request: ChatRequest):
     Main chat endpoint - receives user message and returns RAG response
     Handles multilingual processing and dataset routing
     """
-    if chatbot is None:
-        raise HTTPException(status_code=503, detail="Chatbot not initialized")
+    require_chatbot()
+
+    check_search_type(request.search_type)
     
     try:
-        import time
         start_time = time.time()
-        
-        # Get response from chatbot
-        response = chatbot.query(
-            question=request.message,
-            top_k=request.top_k,
-            auto_detect=request.auto_detect,
-            preferred_language=request.preferred_language
-        )
+
+        async def answer():
+            # Get response from chatbot on the worker pool so the event loop stays free
+            response = await run_in_worker_pool(
+                chatbot.query,
+                question=request.message,
+                top_k=request.top_k,
+                auto_detect=request.auto_detect,
+                preferred_language=request.preferred_language,
+                search_type=request.search_type,
+                filters=request.get_filters()
+            )
+            # Generate follow-up suggestions in the background so /suggestions finds them ready
+            start_llm_suggestions(response["answer"], response["detected_language"], chatbot.llm)
+            return response
+
+        if ChatbotConfig.REQUEST_COALESCING_ENABLED:
+            # Identical questions already in flight are awaited instead of taking another worker
+            response = await chat_single_flight.run(request.coalescing_key(), answer)
+        else:
+            response = await answer()
         
         end_time = time.time()
         response_time = round(end_time - start_time, 2)
@@ -123,32 +314,187 @@ async def chat_endpoint(request: ChatRequest):
             sources=response["sources"],
             num_sources=response["num_sources"],
             detected_language=response["detected_language"],
-            response_time=response_time
+            response_time=response_time,
+            timing=response.get("timing") if request.include_timing else None,
+            route=response.get("route")
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming chat endpoint - Server-Sent Events with a "metadata" event (sources, detected language)
+    once retrieval finishes, then "token" events, a "done" (or "error") event and finally a
+    "suggestions" event with follow-up questions
+    """
+    require_chatbot()
+
+    check_search_type(request.search_type)
+
+    if worker_pool.is_saturated():
+        raise HTTPException(status_code=429, detail="Server is busy, please retry shortly", headers={"Retry-After": "1"})
+
+    async def event_stream():
+        start_time = time.time()
+        first_token_time = None
+        detected_language = request.preferred_language
+        answer = None
+
+        async for event in stream_from_worker_pool(
+            chatbot.stream_query,
+            question=request.message,
+            top_k=request.top_k,
+            auto_detect=request.auto_detect,
+            preferred_language=request.preferred_language,
+            search_type=request.search_type,
+            filters=request.get_filters()
+        ):
+            event_type = event.pop("type")
+            if event_type == "metadata":
+                detected_language = event["detected_language"]
+            if event_type == "token" and first_token_time is None:
+                first_token_time = round(time.time() - start_time, 2)
+            if event_type in ("done", "error"):
+                event["response_time"] = round(time.time() - start_time, 2)
+                event["time_to_first_token"] = first_token_time
+            if event_type == "done":
+                answer = event["answer"]
+            yield format_sse(event_type, event)
+
+        # Push follow-up suggestions once the LLM ones are ready (hardcoded ones if they take too long)
+        if answer:
+            llm_suggestions = []
+            future = start_llm_suggestions(answer, detected_language, chatbot.llm)
+            if future is not None:
+                try:
+                    llm_suggestions = await asyncio.wait_for(
+                        asyncio.wrap_future(future),
+                        timeout=ChatbotConfig.SUGGESTION_STREAM_TIMEOUT
+                    )
+                except Exception:
+                    llm_suggestions = []
+            suggestions = combine_suggestions(get_hardcoded_suggestions(answer, detected_language), llm_suggestions)
+            yield format_sse("suggestions", {"suggestions": suggestions})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/chat/batch", response_model=BatchChatResponse)
+async def chat_batch_endpoint(request: BatchChatRequest):
+    """
+    Batch chat endpoint - embeds all questions in one pass, searches them together and
+    fans the LLM calls out concurrently. Results are returned in input order.
+    """
+    require_chatbot()
+
+    if len(request.requests) > ChatbotConfig.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large, at most {ChatbotConfig.BATCH_MAX_ITEMS} requests allowed")
+
+    for item in request.requests:
+        check_search_type(item.search_type)
+
+    max_concurrency = request.max_concurrency
+    if max_concurrency is None:
+        max_concurrency = ChatbotConfig.BATCH_MAX_CONCURRENCY
+    if max_concurrency < 1:
+        raise HTTPException(status_code=422, detail="max_concurrency must be at least 1")
+
+    try:
+        start_time = time.time()
+
+        items = [
+            {
+                "question": item.message,
+                "top_k": item.top_k,
+                "auto_detect": item.auto_detect,
+                "preferred_language": item.preferred_language,
+                "search_type": item.search_type,
+                "filters": item.get_filters()
+            }
+            for item in request.requests
+        ]
+        # The LLM fan-out runs on threads of its own, so it is limited to the workers that are
+        # free right now (one of which the batch itself is about to take) instead of piling on
+        max_concurrency = min(max_concurrency, ChatbotConfig.BATCH_MAX_CONCURRENCY, max(1, worker_pool.free_workers()))
+        responses = await run_in_worker_pool(chatbot.query_batch, items, max_concurrency=max_concurrency)
+
+        return BatchChatResponse(
+            results=[ChatResponse(**response) for response in responses],
+            total_time=round(time.time() - start_time, 2)
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error processing batch request: {str(e)}")
+
 @app.post("/suggestions", response_model=SuggestionsResponse)
 async def suggestions_endpoint(request: SuggestionsRequest):
     """
-    Suggestions endpoint - returns context-aware follow-up questions (hardcoded + LLM-generated)
+    Suggestions endpoint - returns context-aware follow-up questions (hardcoded + LLM-generated).
+    LLM suggestions are generated in the background; until they are ready the hardcoded ones are
+    returned immediately with pending=true, and a later call returns the LLM ones.
     """
     try:
         # Pass the LLM instance to enable LLM-generated suggestions
         llm_instance = chatbot.llm if chatbot else None
 
-        suggestions = get_context_suggestions(
+        suggestions = await run_in_worker_pool(
+            get_context_suggestions,
             response_content=request.response_content,
             language=request.language,
-            llm=llm_instance
+            llm=llm_instance,
+            timeout=ChatbotConfig.SUGGESTION_WAIT_SECONDS
         )
 
-        return SuggestionsResponse(suggestions=suggestions)
+        return SuggestionsResponse(
+            suggestions=suggestions,
+            pending=is_llm_suggestions_pending(request.response_content, request.language)
+        )
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating suggestions: {str(e)}")
 
+@app.post("/admin/reload")
+async def reload_endpoint(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Hot-reload the vector store after re-indexing (see ingestion/ingest.py), without a restart.
+    Requires the X-Admin-Token header when ADMIN_TOKEN is configured.
+    """
+    require_chatbot()
+
+    if ChatbotConfig.ADMIN_TOKEN and x_admin_token != ChatbotConfig.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+    try:
+        count = await run_in_worker_pool(chatbot.reload_vectorstore)
+        return {"status": "reloaded", "vector_store_count": count}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reloading vector store: {str(e)}")
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus metrics: request counts/latency and per-stage durations"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+@app.get("/facets")
+async def get_facets():
+    """Metadata values /chat can filter on (table flag, page titles, URLs) with chunk counts"""
+    require_chatbot()
+    return await run_in_worker_pool(lambda: chatbot.get_metadata_index().facets())
+
 @app.get("/languages")
 async def get_supported_languages():
     """Get list of supported languages"""
@@ -0,0 +1,76 @@
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain.chains import RetrievalQA
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.llms.fake import FakeListLLM
+from langchain_community.vectorstores import Chroma
+
+from modules.chatbot_core import APECChatbot
+from modules.config import ChatbotConfig
+
+
+class BenchmarkChatbot(APECChatbot):
+    """APECChatbot wired to a fake LLM and an in-memory vector store"""
+
+    def setup_models(self):
+        self.embeddings = FakeEmbeddings(size=32)
+        self.embedding_model = self.embeddings
+        self.vectorstore = Chroma.from_texts(
+            texts=[f"passage: APEC document {i}" for i in range(50)],
+            embedding=self.embeddings
+        )
+        self.llm = FakeListLLM(responses=["APEC answer"])
+
+
+def time_calls(fn, iterations):
+    """Return mean microseconds per call and peak traced memory in KB"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / iterations * 1e6, peak / 1024
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chatbot = BenchmarkChatbot(api_key="benchmark")
+    search_type = ChatbotConfig.DEFAULT_SEARCH_TYPE
+    top_k = ChatbotConfig.DEFAULT_TOP_K
+
+    def rebuild_per_request(i):
+        # What query() used to do: new prompt, retriever and RetrievalQA chain on every call
+        language = ChatbotConfig.SUPPORTED_LANGUAGES[i % 2]
+        RetrievalQA.from_chain_type(
+            llm=chatbot.llm,
+            chain_type="stuff",
+            retriever=chatbot.get_retriever(search_type, top_k),
+            chain_type_kwargs={"prompt": chatbot.get_language_specific_prompt(language)},
+            return_source_documents=True
+        )
+
+    def registry_lookup(i):
+        # What query() does now: pre-built prompt plus a retriever from the (search_type, top_k) registry
+        language = ChatbotConfig.SUPPORTED_LANGUAGES[i % 2]
+        chatbot.get_prompt(language)
+        chatbot.get_cached_retriever(search_type, top_k)
+
+    rebuild_us, rebuild_kb = time_calls(rebuild_per_request, iterations)
+    chatbot.setup_retrievers()
+    lookup_us, lookup_kb = time_calls(registry_lookup, iterations)
+
+    print(f"Iterations: {iterations}")
+    print(f"Rebuild per request: {rebuild_us:10.1f} us/call, peak {rebuild_kb:8.1f} KB")
+    print(f"Registry lookup:     {lookup_us:10.1f} us/call, peak {lookup_kb:8.1f} KB")
+    print(f"Overhead removed:    {rebuild_us - lookup_us:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+API_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api_backend')
+HEAVY_MODULES = ["streamlit", "langchain", "langchain_core", "chromadb", "sentence_transformers", "torch", "langdetect"]
+
+IMPORT_PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import api_backend
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import():
+    """Fresh-process import time of the API module, i.e. how long before uvicorn can bind"""
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=API_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def get_health(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except (urllib.error.URLError, ConnectionError):
+        return None, None
+
+
+def measure_server(parallel, port, timeout=600):
+    """Start uvicorn and time the first /health answer and the moment it reports ready"""
+    env = dict(os.environ, PARALLEL_STARTUP="true" if parallel else "false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_backend:app", "--port", str(port)],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    start = time.perf_counter()
+    first_response = None
+    try:
+        while time.perf_counter() - start < timeout:
+            status, body = get_health(port)
+            if status is not None and first_response is None:
+                first_response = time.perf_counter() - start
+            if status == 200:
+                return {
+                    "first_health_seconds": round(first_response, 2),
+                    "ready_seconds": round(time.perf_counter() - start, 2),
+                    "components": body.get("startup", {}).get("components", {})
+                }
+            if body and body.get("status") == "failed":
+                return {"first_health_seconds": round(first_response, 2), "error": body.get("error")}
+            time.sleep(0.1)
+        return {"error": "timed out"}
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+
+    report = {"import_api_backend": measure_import()}
+    print(f"import api_backend: {report['import_api_backend']['seconds']:.2f}s, "
+          f"heavy modules loaded: {report['import_api_backend']['loaded'] or 'none'}")
+
+    for parallel in (False, True):
+        name = "parallel" if parallel else "sequential"
+        report[name] = measure_server(parallel, port)
+        print(f"{name:10s} startup: {report[name]}")
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.filters import MetadataFilter, MetadataIndex
+from modules.retrievers import NumpyVectorIndex
+
+from bench_retrieval import QUERIES, time_per_query
+
+FILTERS = {
+    "tables only": {"contains_table": True},
+    "prose only": {"contains_table": False},
+    "url prefix (news board)": {"url_prefixes": ["https://apec2025.kr/?menuno=16"]},
+    "tables under apec2025.kr": {"contains_table": True, "url_prefixes": ["https://apec2025.kr"]},
+}
+
+
+def post_filter_search(index, metadata_filter, query_embedding, k):
+    """Baseline: score everything, over-fetch, then drop non-matching chunks"""
+    hits = index.search(query_embedding, k * 4)
+    return [(row, score) for row, score in hits if metadata_filter.matches(index.documents[row].metadata)][:k]
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else ChatbotConfig.DEFAULT_TOP_K
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL))
+    vectorstore = Chroma(persist_directory=ChatbotConfig.VECTOR_DB_PATH, embedding_function=embeddings)
+    collection = vectorstore._collection
+    query_vectors = [embeddings.embed_query(f"query: {q}") for q in QUERIES]
+
+    index = NumpyVectorIndex.from_chroma(collection)
+    start = time.perf_counter()
+    metadata_index = MetadataIndex.from_documents(index.documents)
+    print(f"Collection: {len(index)} chunks, k={k}; metadata posting lists built in "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
+
+    numpy_ms = time_per_query(lambda v: index.search(v, k), query_vectors, repeats)
+    chroma_ms = time_per_query(lambda v: collection.query(query_embeddings=[v], n_results=k), query_vectors, repeats)
+    print(f"{'unfiltered':26s} numpy {numpy_ms:7.3f} ms  chroma {chroma_ms:7.3f} ms")
+
+    for name, data in FILTERS.items():
+        metadata_filter = MetadataFilter.from_dict(data)
+        resolve_ms = time_per_query(lambda _: metadata_index.rows(metadata_filter), [None], repeats * 10)
+        rows = metadata_index.rows(metadata_filter)
+        if len(rows) == 0:
+            print(f"{name:26s} matches no chunks")
+            continue
+        where = metadata_index.chroma_where(metadata_filter)
+
+        pre_ms = time_per_query(lambda v: index.search(v, k, rows=metadata_index.rows(metadata_filter)), query_vectors, repeats)
+        post_ms = time_per_query(lambda v: post_filter_search(index, metadata_filter, v, k), query_vectors, repeats)
+        chroma_where_ms = time_per_query(
+            lambda v: collection.query(query_embeddings=[v], n_results=min(k, len(rows)), where=where),
+            query_vectors, repeats
+        )
+        # Post-filtering can come back short when the matching chunks rank below the over-fetch window
+        post_found = sum(len(post_filter_search(index, metadata_filter, v, k)) for v in query_vectors)
+        expected = min(k, len(rows)) * len(query_vectors)
+
+        print(f"{name:26s} {len(rows):5d} rows (resolved in {resolve_ms:.4f} ms)  "
+              f"numpy pre-filter {pre_ms:7.3f} ms  post-filter {post_ms:7.3f} ms "
+              f"({post_found}/{expected} results)  chroma where {chroma_where_ms:7.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain.schema import Document
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.lexical import BM25Index, HybridRetriever
+
+# Exact-term queries; a chunk is relevant when it contains every listed term
+TERM_QUERIES = [
+    ("When is SOM2?", ["SOM2"]),
+    ("Where is the MRT meeting held?", ["MRT", "Jeju"]),
+    ("ABAC meeting dates", ["ABAC"]),
+    ("HRDMM Jeju", ["HRDMM"]),
+    ("FTAAP agenda", ["FTAAP"]),
+    ("AELM Gyeongju", ["AELM"]),
+    ("Lịch họp SOM3", ["SOM3"]),
+    ("Hội nghị MRT ở đâu?", ["MRT"]),
+    ("UNCITRAL MLETR", ["MLETR"]),
+    ("Digital & AI Ministerial Meeting", ["Digital", "Ministerial"]),
+]
+
+
+def recall_at_k(docs, relevant, k):
+    if not relevant:
+        return None
+    found = sum(1 for doc in docs[:k] if doc.page_content in relevant)
+    return found / min(k, len(relevant))
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else ChatbotConfig.DEFAULT_TOP_K
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL))
+    vectorstore = Chroma(persist_directory=ChatbotConfig.VECTOR_DB_PATH, embedding_function=embeddings)
+    data = vectorstore._collection.get(include=["documents", "metadatas"])
+    documents = [Document(page_content=t, metadata=m or {}) for t, m in zip(data["documents"], data["metadatas"])]
+
+    start = time.perf_counter()
+    index = BM25Index.build(documents)
+    build_ms = (time.perf_counter() - start) * 1000
+    postings_kb = (index.indptr.nbytes + index.doc_ids.nbytes + index.term_freqs.nbytes) / 1024
+    print(f"BM25 build: {build_ms:.1f} ms for {len(documents)} chunks, {len(index.vocabulary)} terms, postings {postings_kb:.1f} KB")
+
+    dense = vectorstore.as_retriever(search_kwargs={"k": k * ChatbotConfig.HYBRID_CANDIDATE_MULTIPLIER})
+    hybrid = HybridRetriever(
+        dense_retriever=dense,
+        lexical_index=index,
+        k=k,
+        candidate_k=k * ChatbotConfig.HYBRID_CANDIDATE_MULTIPLIER,
+        rrf_k=ChatbotConfig.RRF_K
+    )
+    methods = {
+        "dense": lambda q: dense.get_relevant_documents(q)[:k],
+        "bm25": lambda q: [index.documents[i] for i, _ in index.search(q, k)],
+        "hybrid (rrf)": lambda q: hybrid.get_relevant_documents(q),
+    }
+
+    for name, search in methods.items():
+        recalls = []
+        elapsed = 0.0
+        for question, terms in TERM_QUERIES:
+            relevant = {d.page_content for d in documents if all(t.lower() in d.page_content.lower() for t in terms)}
+            start = time.perf_counter()
+            docs = search(f"query: {question}")
+            elapsed += time.perf_counter() - start
+            recall = recall_at_k(docs, relevant, k)
+            if recall is not None:
+                recalls.append(recall)
+        mean_recall = sum(recalls) / len(recalls) if recalls else 0.0
+        print(f"{name:14s} recall@{k} {mean_recall:.3f}  {elapsed / len(TERM_QUERIES) * 1000:8.2f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import langdetect
+
+from modules.utils import detect_language, _detect_normalized_language
+
+REQUESTS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'requests.jsonl')
+
+# Hand-labelled user questions, including the ones quoted in requests.jsonl
+LABELLED_QUESTIONS = [
+    ("APEC là gì", "vi"),
+    ("What is APEC?", "en"),
+    ("meetings in May", "en"),
+    ("where is the SOM held", "en"),
+    ("Lịch họp APEC 2025 sự kiện", "vi"),
+    ("APEC member countries", "en"),
+    ("APEC 2025 meetings schedule events", "en"),
+    ("Các cuộc họp trong tháng 5?", "vi"),
+    ("Địa điểm tổ chức hội nghị ở đâu?", "vi"),
+    ("apec la gi", "vi"),
+    ("lich hop thang 5", "vi"),
+    ("dia diem to chuc o dau", "vi"),
+    ("Who will attend these events?", "en"),
+    ("How to get to Gyeongju?", "en"),
+    ("Thông tin về Busan", "vi"),
+    ("Tell me about Jeju", "en"),
+    ("Gyeongju", "en"),
+    ("SOM1", "en"),
+]
+
+
+def legacy_detect_language(text):
+    """The previous implementation: unseeded langdetect plus a per-call character set"""
+    try:
+        detected = langdetect.detect(text)
+        vietnamese_chars = set('àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ')
+        has_vietnamese = any(char in vietnamese_chars for char in text.lower())
+
+        if has_vietnamese or detected == 'vi':
+            return 'vi'
+        else:
+            return 'en'
+    except:
+        return 'en'
+
+
+def load_questions():
+    """Labelled questions plus the (English) request titles from requests.jsonl when available"""
+    questions = list(LABELLED_QUESTIONS)
+    if os.path.exists(REQUESTS_FILE):
+        with open(REQUESTS_FILE, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    questions.append((json.loads(line)["title"], "en"))
+    return questions
+
+
+def measure(detector, questions, repeats, clear_cache=None):
+    correct = sum(1 for text, label in questions if detector(text) == label)
+    start = time.perf_counter()
+    for _ in range(repeats):
+        if clear_cache:
+            clear_cache()
+        for text, _ in questions:
+            detector(text)
+    per_call_us = (time.perf_counter() - start) / (repeats * len(questions)) * 1e6
+    return correct / len(questions), per_call_us
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    questions = load_questions()
+
+    start = time.perf_counter()
+    legacy_detect_language("warm up")
+    legacy_first_ms = (time.perf_counter() - start) * 1000
+
+    legacy_accuracy, legacy_us = measure(legacy_detect_language, questions, repeats)
+    uncached_accuracy, uncached_us = measure(detect_language, questions, repeats, _detect_normalized_language.cache_clear)
+    cached_accuracy, cached_us = measure(detect_language, questions, repeats)
+
+    print(f"Questions: {len(questions)}, repeats: {repeats}")
+    print(f"Legacy langdetect first call: {legacy_first_ms:8.1f} ms")
+    print(f"Legacy langdetect:  accuracy {legacy_accuracy:6.1%}, {legacy_us:10.1f} us/call")
+    print(f"Fast path uncached: accuracy {uncached_accuracy:6.1%}, {uncached_us:10.1f} us/call")
+    print(f"Fast path cached:   accuracy {cached_accuracy:6.1%}, {cached_us:10.1f} us/call")
+
+    for text, label in questions:
+        if detect_language(text) != label:
+            print(f"  miss: {text!r} expected {label}")
+
+
+if __name__ == "__main__":
+    main()
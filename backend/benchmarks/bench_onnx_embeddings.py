@@ -0,0 +1,121 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from modules.config import ChatbotConfig
+from modules.embeddings import get_embedding_model
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), 'requests.jsonl')
+CHUNKS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed', 'chunked_documents.json')
+BACKENDS = ["sentence-transformers", "onnx"]
+K = 5
+
+
+def load_texts():
+    with open(CHUNKS_PATH, encoding='utf-8') as f:
+        passages = [f"passage: {chunk['content']}".replace("\n", " ") for chunk in json.load(f)]
+    with open(QUESTIONS_PATH, encoding='utf-8') as f:
+        queries = [f"query: {json.loads(line)['question']}" for line in f if line.strip()]
+    return passages, queries
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def measure(backend):
+    """Load one backend in this (fresh) process and report load time, RSS and latency"""
+    passages, queries = load_texts()
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    model = get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, backend)
+    load_seconds = time.perf_counter() - start
+
+    model.encode(queries[:2], normalize_embeddings=True)
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        model.encode([query], normalize_embeddings=True)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    model.encode(passages, normalize_embeddings=True)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round(rss_mb() - rss_before, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "query_p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "query_p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "passages_per_sec": round(len(passages) / batch_seconds, 1)
+    }
+
+
+def recall_at_k(reference_scores, candidate_scores, k):
+    recalls = []
+    for reference, candidate in zip(reference_scores, candidate_scores):
+        expected = set(np.argsort(-reference)[:k])
+        found = set(np.argsort(-candidate)[:k])
+        recalls.append(len(expected & found) / k)
+    return float(np.mean(recalls))
+
+
+def parity():
+    """Compare ONNX int8 vectors to the PyTorch ones on the chunk corpus and the benchmark queries"""
+    passages, queries = load_texts()
+    reference = get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, "sentence-transformers")
+    quantized = get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, "onnx")
+
+    ref_passages = reference.encode(passages, normalize_embeddings=True)
+    ref_queries = reference.encode(queries, normalize_embeddings=True)
+    onnx_passages = quantized.encode(passages, normalize_embeddings=True)
+    onnx_queries = quantized.encode(queries, normalize_embeddings=True)
+
+    passage_cosine = np.sum(ref_passages * onnx_passages, axis=1)
+    query_cosine = np.sum(ref_queries * onnx_queries, axis=1)
+    reference_scores = ref_queries @ ref_passages.T
+    return {
+        "passage_cosine_mean": round(float(passage_cosine.mean()), 4),
+        "passage_cosine_min": round(float(passage_cosine.min()), 4),
+        "query_cosine_mean": round(float(query_cosine.mean()), 4),
+        "query_cosine_min": round(float(query_cosine.min()), 4),
+        # Serving setup: the stored chunk vectors stay fp32, only the queries use the int8 model
+        f"recall@{K}_onnx_queries_vs_stored": round(recall_at_k(reference_scores, onnx_queries @ ref_passages.T, K), 3),
+        # Full re-index with the int8 model
+        f"recall@{K}_onnx_everything": round(recall_at_k(reference_scores, onnx_queries @ onnx_passages.T, K), 3)
+    }
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--measure":
+        print(json.dumps(measure(sys.argv[2])))
+        return
+
+    report = {"backends": []}
+    for backend in BACKENDS:
+        # Separate processes so RSS and load time are not skewed by the other model
+        output = subprocess.run(
+            [sys.executable, __file__, "--measure", backend], capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        report["backends"].append(result)
+        print(f"{backend:22s} load {result['load_seconds']:6.2f}s  +{result['rss_mb']:7.1f} MB  "
+              f"query p50 {result['query_p50_ms']:7.2f} ms  p95 {result['query_p95_ms']:7.2f} ms  "
+              f"{result['passages_per_sec']:6.1f} passages/s")
+
+    report["parity"] = parity()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
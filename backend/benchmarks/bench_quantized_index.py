@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.retrievers import NumpyVectorIndex, QuantizedVectorIndex
+
+from bench_retrieval import QUERIES, recall_at_k
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Memory, QPS and recall of the int8/binary indexes versus Chroma")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Replicate the collection (with small perturbations) to estimate larger corpora")
+    return parser.parse_args()
+
+
+def directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def queries_per_second(fn, queries, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            fn(query)
+    return repeats * len(queries) / (time.perf_counter() - start)
+
+
+def scaled_index(index, scale, seed=0):
+    """Perturbed copies of the collection, re-normalized, so neighbours stay realistic at larger sizes"""
+    if scale <= 1:
+        return index
+    rng = np.random.default_rng(seed)
+    base = np.asarray(index.embeddings, dtype=np.float32)
+    copies = [base]
+    for _ in range(scale - 1):
+        noisy = base + rng.normal(scale=0.01, size=base.shape).astype(np.float32)
+        copies.append(noisy / np.linalg.norm(noisy, axis=1, keepdims=True))
+    ids = [f"{doc_id}#{copy}" for copy in range(scale) for doc_id in index.ids]
+    return NumpyVectorIndex(np.vstack(copies), index.documents * scale, ids)
+
+
+def main():
+    args = parse_args()
+    k = args.k
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL))
+    vectorstore = Chroma(persist_directory=ChatbotConfig.VECTOR_DB_PATH, embedding_function=embeddings)
+    collection = vectorstore._collection
+    query_vectors = [embeddings.embed_query(f"query: {q}") for q in QUERIES]
+
+    index_dir = tempfile.mkdtemp()
+    scaled_index(NumpyVectorIndex.from_chroma(collection), args.scale).save(index_dir)
+    exact = NumpyVectorIndex.load(index_dir)
+    backends = {
+        "int8 + float rescoring": QuantizedVectorIndex.load(
+            index_dir, mode="int8", rescore_multiplier=ChatbotConfig.INT8_RESCORE_MULTIPLIER
+        ),
+        "binary + float rescoring": QuantizedVectorIndex.load(
+            index_dir, mode="binary", rescore_multiplier=ChatbotConfig.BINARY_RESCORE_MULTIPLIER
+        ),
+    }
+
+    # Exact float32 search is the ground truth for recall
+    ground_truth = [[row for row, _ in exact.search(v, k)] for v in query_vectors]
+    float_mb = np.asarray(exact.embeddings).nbytes / 1024 / 1024
+    print(f"Collection: {len(exact)} chunks (scale x{args.scale}), dim {exact.embeddings.shape[1]}, k={k}")
+    print(f"{'backend':26s} {'resident MB':>12s} {'on disk MB':>11s} {'QPS':>9s} {'recall@' + str(k):>9s}")
+
+    if args.scale == 1:
+        chroma_qps = queries_per_second(
+            lambda v: collection.query(query_embeddings=[v], n_results=k), query_vectors, args.repeats
+        )
+        id_rows = {doc_id: row for row, doc_id in enumerate(exact.ids)}
+        chroma_rows = [
+            [id_rows[doc_id] for doc_id in collection.query(query_embeddings=[v], n_results=k)["ids"][0]]
+            for v in query_vectors
+        ]
+        # Chroma keeps the HNSW graph and its float vectors in memory, so its directory is a lower bound
+        chroma_mb = directory_size(ChatbotConfig.VECTOR_DB_PATH) / 1024 / 1024
+        print(f"{'chroma (sqlite + hnsw)':26s} {chroma_mb:12.2f} {chroma_mb:11.2f} {chroma_qps:9.1f} "
+              f"{recall_at_k(chroma_rows, ground_truth):9.3f}")
+    else:
+        print("(chroma skipped: the scaled corpus only exists as a numpy export)")
+
+    exact_qps = queries_per_second(lambda v: exact.search(v, k), query_vectors, args.repeats)
+    print(f"{'numpy float32 (exact)':26s} {float_mb:12.2f} {float_mb:11.2f} {exact_qps:9.1f} {1.0:9.3f}")
+
+    for name, index in backends.items():
+        qps = queries_per_second(lambda v: index.search(v, k), query_vectors, args.repeats)
+        rows = [[row for row, _ in index.search(v, k)] for v in query_vectors]
+        resident_mb = index.memory_bytes() / 1024 / 1024
+        # Only the rescored candidates are read from the memory-mapped float matrix
+        print(f"{name:26s} {resident_mb:12.2f} {resident_mb + float_mb:11.2f} {qps:9.1f} "
+              f"{recall_at_k(rows, ground_truth):9.3f}")
+
+
+if __name__ == "__main__":
+    main()
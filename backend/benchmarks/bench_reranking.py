@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.reranking import CrossEncoderReranker, get_cross_encoder
+
+# A chunk is relevant when it contains every listed term
+TERM_QUERIES = [
+    ("When is SOM2?", ["SOM2"]),
+    ("Where is the MRT meeting held?", ["MRT", "Jeju"]),
+    ("ABAC meeting dates", ["ABAC"]),
+    ("HRDMM Jeju", ["HRDMM"]),
+    ("Lịch họp SOM3", ["SOM3"]),
+    ("Hội nghị MRT ở đâu?", ["MRT"]),
+    ("Digital & AI Ministerial Meeting", ["Digital", "Ministerial"]),
+    ("Thủ tục visa vào Hàn Quốc", ["visa"]),
+]
+CANDIDATE_COUNTS = [5, 10, 20, 40]
+
+
+def recall_at_k(docs, relevant, k):
+    if not relevant:
+        return None
+    found = sum(1 for doc in docs[:k] if doc.page_content in relevant)
+    return found / min(k, len(relevant))
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else ChatbotConfig.DEFAULT_TOP_K
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL))
+    vectorstore = Chroma(persist_directory=ChatbotConfig.VECTOR_DB_PATH, embedding_function=embeddings)
+    data = vectorstore._collection.get(include=["documents"])
+    documents = data["documents"]
+
+    start = time.perf_counter()
+    model = get_cross_encoder(ChatbotConfig.RERANK_MODEL)
+    print(f"Loaded {ChatbotConfig.RERANK_MODEL} in {time.perf_counter() - start:.1f}s")
+
+    for n in CANDIDATE_COUNTS:
+        if n < k:
+            continue
+        reranker = CrossEncoderReranker(model, batch_size=ChatbotConfig.RERANK_BATCH_SIZE)
+        retriever = vectorstore.as_retriever(search_kwargs={"k": n})
+
+        dense_recalls, rerank_recalls = [], []
+        cold_ms, warm_ms, context_chars = 0.0, 0.0, 0
+        for question, terms in TERM_QUERIES:
+            relevant = {d for d in documents if all(t.lower() in d.lower() for t in terms)}
+            search_question = f"query: {question}"
+            candidates = retriever.get_relevant_documents(search_question)
+
+            start = time.perf_counter()
+            reranked = reranker.rerank(search_question, candidates, k)
+            cold_ms += (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            reranker.rerank(search_question, candidates, k)
+            warm_ms += (time.perf_counter() - start) * 1000
+
+            context_chars += sum(len(doc.page_content) for doc in reranked)
+            for recalls, docs in ((dense_recalls, candidates[:k]), (rerank_recalls, reranked)):
+                recall = recall_at_k(docs, relevant, k)
+                if recall is not None:
+                    recalls.append(recall)
+
+        queries = len(TERM_QUERIES)
+        print(f"N={n:3d}  recall@{k} dense {sum(dense_recalls) / len(dense_recalls):.3f} "
+              f"-> reranked {sum(rerank_recalls) / len(rerank_recalls):.3f}  "
+              f"rerank {cold_ms / queries:7.1f} ms/query (cached {warm_ms / queries:.2f} ms)  "
+              f"~{context_chars / queries / 4:.0f} context tokens/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.retrievers import NumpyVectorIndex
+
+QUERIES = [
+    "What is APEC?",
+    "APEC là gì",
+    "APEC member countries",
+    "APEC 2025 meetings schedule events",
+    "Lịch họp APEC 2025 sự kiện",
+    "Where is the SOM held?",
+    "Meetings in May",
+    "Địa điểm tổ chức hội nghị ở đâu?",
+    "About Gyeongju",
+    "Press releases about the Leaders' Meeting",
+]
+
+
+def time_per_query(fn, queries, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for query in queries:
+            fn(query)
+    return (time.perf_counter() - start) / (repeats * len(queries)) * 1000
+
+
+def recall_at_k(results, ground_truth):
+    hits = sum(len(set(r) & set(g)) for r, g in zip(results, ground_truth))
+    return hits / sum(len(g) for g in ground_truth)
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else ChatbotConfig.DEFAULT_TOP_K
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL))
+    vectorstore = Chroma(persist_directory=ChatbotConfig.VECTOR_DB_PATH, embedding_function=embeddings)
+    collection = vectorstore._collection
+    query_vectors = [embeddings.embed_query(f"query: {q}") for q in QUERIES]
+
+    exact = NumpyVectorIndex.from_chroma(collection)
+    index_dir = tempfile.mkdtemp()
+    exact.save(os.path.join(index_dir, "float32"), dtype="float32")
+    exact.save(os.path.join(index_dir, "float16"), dtype="float16")
+    backends = {
+        "numpy float32 (mmap)": NumpyVectorIndex.load(os.path.join(index_dir, "float32")),
+        "numpy float16 (mmap)": NumpyVectorIndex.load(os.path.join(index_dir, "float16")),
+    }
+
+    # Exact float32 search is the ground truth for recall
+    ground_truth = [[exact.ids[row] for row, _ in exact.search(v, k)] for v in query_vectors]
+
+    print(f"Collection: {len(exact)} chunks, dim {exact.embeddings.shape[1]}, k={k}")
+
+    chroma_ms = time_per_query(lambda v: collection.query(query_embeddings=[v], n_results=k), query_vectors, repeats)
+    chroma_ids = [collection.query(query_embeddings=[v], n_results=k)["ids"][0] for v in query_vectors]
+    print(f"{'chroma (sqlite + hnsw)':24s} {chroma_ms:8.3f} ms/query  recall@{k} {recall_at_k(chroma_ids, ground_truth):.3f}")
+
+    for name, index in backends.items():
+        ms = time_per_query(lambda v: index.search(v, k), query_vectors, repeats)
+        ids = [[index.ids[row] for row, _ in index.search(v, k)] for v in query_vectors]
+        size_mb = np.asarray(index.embeddings).nbytes / 1024 / 1024
+        print(f"{name:24s} {ms:8.3f} ms/query  recall@{k} {recall_at_k(ids, ground_truth):.3f}  matrix {size_mb:.2f} MB")
+
+    start = time.perf_counter()
+    backends["numpy float32 (mmap)"].search_batch(query_vectors, k)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(query_vectors)
+    print(f"{'numpy float32 batched':24s} {batch_ms:8.3f} ms/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+
+# Same question worded differently: the semantic cache should answer the second from the first
+PARAPHRASE_PAIRS = [
+    ("What is APEC?", "what is apec"),
+    ("What is APEC?", "Can you tell me what APEC is?"),
+    ("Where is the SOM1 held?", "Where will SOM1 take place?"),
+    ("When is the APEC Economic Leaders' Week?", "When does APEC Economic Leaders' Week take place?"),
+    ("Which economies are APEC members?", "Which economies are members of APEC?"),
+    ("How do I get to Gyeongju?", "How can I get to Gyeongju?"),
+    ("APEC là gì?", "APEC là gì vậy?"),
+    ("Hội nghị SOM1 tổ chức ở đâu?", "SOM1 được tổ chức ở đâu?"),
+    ("Lịch họp tháng 5", "Lịch các cuộc họp trong tháng 5"),
+]
+
+# Nearly the same words but a different answer: serving one for the other is a wrong answer
+NEAR_MISS_PAIRS = [
+    ("Which meetings are held in May?", "Which meetings are held in June?"),
+    ("Where is SOM2 held?", "Where is SOM3 held?"),
+    ("When is SOM1?", "When is SOM2?"),
+    ("What meetings are in Busan?", "What meetings are in Jeju?"),
+    ("When is the ABAC meeting in Seoul?", "When is the ABAC meeting in Busan?"),
+    ("Who can attend the CEO Summit?", "Who can attend the Leaders' Meeting?"),
+    ("Events in 2024", "Events in 2025"),
+    ("Lịch họp tháng 5", "Lịch họp tháng 6"),
+    ("SOM2 tổ chức ở đâu?", "SOM3 tổ chức ở đâu?"),
+    ("Hội nghị ở Busan diễn ra khi nào?", "Hội nghị ở Jeju diễn ra khi nào?"),
+]
+
+
+def similarities(embeddings, pairs):
+    scores = []
+    for first, second in pairs:
+        a = np.asarray(embeddings.embed_query(first), dtype=np.float32)
+        b = np.asarray(embeddings.embed_query(second), dtype=np.float32)
+        scores.append(float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b))))
+    return scores
+
+
+def print_pairs(title, pairs, scores, threshold):
+    print(f"\n{title}")
+    for (first, second), score in zip(pairs, scores):
+        print(f"  {score:.4f} {'HIT ' if score >= threshold else 'miss'}  {first!r} / {second!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the semantic cache threshold separates paraphrases from near misses")
+    parser.add_argument("--threshold", type=float, default=ChatbotConfig.SEMANTIC_CACHE_THRESHOLD)
+    args = parser.parse_args()
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, ChatbotConfig.EMBEDDING_BACKEND))
+    paraphrase_scores = similarities(embeddings, PARAPHRASE_PAIRS)
+    near_miss_scores = similarities(embeddings, NEAR_MISS_PAIRS)
+
+    print(f"Model: {ChatbotConfig.EMBEDDING_MODEL}, threshold: {args.threshold}")
+    print_pairs("Paraphrases (should hit)", PARAPHRASE_PAIRS, paraphrase_scores, args.threshold)
+    print_pairs("Near misses (must miss)", NEAR_MISS_PAIRS, near_miss_scores, args.threshold)
+
+    wrong_answers = sum(score >= args.threshold for score in near_miss_scores)
+    hits = sum(score >= args.threshold for score in paraphrase_scores)
+    lowest_paraphrase, highest_near_miss = min(paraphrase_scores), max(near_miss_scores)
+    print(f"\nParaphrase hits: {hits}/{len(PARAPHRASE_PAIRS)}")
+    print(f"Near misses answered from the cache (wrong answers): {wrong_answers}/{len(NEAR_MISS_PAIRS)}")
+    print(f"Lowest paraphrase similarity: {lowest_paraphrase:.4f}, highest near-miss similarity: {highest_near_miss:.4f}")
+
+    if highest_near_miss < lowest_paraphrase:
+        print(f"Any threshold in ({highest_near_miss:.4f}, {lowest_paraphrase:.4f}] separates the pairs")
+    else:
+        print("No threshold separates the pairs: similarity alone cannot tell these near misses apart")
+    if wrong_answers:
+        print("FAIL: keep SEMANTIC_CACHE_ENABLED off at this threshold")
+        sys.exit(1)
+    print("OK: no near miss would be served from the cache")
+
+
+if __name__ == "__main__":
+    main()
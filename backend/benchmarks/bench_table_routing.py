@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from langchain.schema import Document
+
+from modules.config import ChatbotConfig
+from modules.routing import TableQueryRouter
+from modules.table_store import TableStore
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), 'requests.jsonl')
+CHUNKS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed', 'chunked_documents.json')
+
+# Questions that mention an event or a month but are not schedule/venue lookups; none may be routed
+NEGATIVE_QUESTIONS = [
+    ("What topics will be discussed at the SOM2 meeting?", "en"),
+    ("Who attends the MRT meeting?", "en"),
+    ("What is the purpose of ABAC meetings?", "en"),
+    ("Can I register for the DMM event?", "en"),
+    ("What are the outcomes of the meetings in May?", "en"),
+    ("How do I get to the events in Jeju?", "en"),
+    ("Tell me about the SOM1 meeting", "en"),
+    ("Hội nghị SOM2 sẽ thảo luận chủ đề gì?", "vi"),
+    ("Ai sẽ tham dự cuộc họp MRT?", "vi"),
+    ("Mục đích của các cuộc họp ABAC là gì?", "vi"),
+    ("Làm sao để đăng ký tham gia sự kiện DMM?", "vi"),
+    ("Can I visit Jeju during the meetings?", "en"),
+    ("Where can I stay near the SOM venue?", "en"),
+    ("What is the weather in Busan during the meetings?", "en"),
+    ("Are meetings in Busan open to the public?", "en"),
+    ("When is the SOM3 and what will be decided?", "en"),
+    ("Events in Seoul next week", "en"),
+    ("When is the third ABAC meeting?", "en"),
+    ("Hội nghị ABAC lần thứ 3 tổ chức ở đâu?", "vi"),
+    ("Lịch họp tuần sau", "vi"),
+]
+
+# Schedule/venue lookups with the events the answer must list (name fragments), to measure precision
+LABELLED_QUESTIONS = [
+    ("When is the Second Senior Officials' Meeting (SOM2)?", "en", ["(SOM2)"]),
+    ("Where is the Energy Ministerial Meeting held?", "en", ["(EMM)"]),
+    ("When is the ABAC meeting in Busan?", "en", ["4th APEC Business Advisory Council"]),
+    ("Where is the SOM held?", "en", ["(SOM1)", "(SOM2)", "(SOM3)"]),
+    ("Events in Seoul", "en", ["High-Level Meeting on Health and the Economy"]),
+    ("Events in Seoul in 2024", "en", ["(ISOM)"]),
+    ("Which meetings take place in Busan?", "en", ["(AOMM)", "(EMM)", "4th APEC Business Advisory Council"]),
+    ("Hội nghị SOM3 diễn ra khi nào?", "vi", ["(SOM3)"]),
+    ("Khi nào diễn ra MRT?", "vi", ["(MRT)"]),
+    ("Những hội nghị nào diễn ra tại Hai Phong?", "vi", ["3rd APEC Business Advisory Council"]),
+    ("Lịch họp tháng 10", "vi", ["(FMM)", "(SRMM)", "4th APEC Business Advisory Council"]),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="How many questions the table fast path answers, and how fast")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="JSONL file with {\"question\", \"language\"} per line")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--chatbot", action="store_true",
+                        help="Also time APECChatbot.query end to end (needs the models and GOOGLE_API_KEY)")
+    parser.add_argument("--verbose", action="store_true", help="Print the route taken by every question")
+    return parser.parse_args()
+
+
+def load_questions(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def build_router():
+    with open(CHUNKS_PATH, encoding='utf-8') as f:
+        documents = [Document(page_content=chunk['content'], metadata=chunk['metadata']) for chunk in json.load(f)]
+    start = time.perf_counter()
+    store = TableStore.build(os.path.join(tempfile.mkdtemp(), "table_store.sqlite3"), documents)
+    print(f"Parsed {len(store)} events from {len(documents)} chunks in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return TableQueryRouter(store, max_rows=ChatbotConfig.TABLE_ROUTING_MAX_ROWS)
+
+
+def percentiles(latencies):
+    latencies = np.array(latencies) * 1000
+    return f"p50 {np.percentile(latencies, 50):8.3f} ms  p95 {np.percentile(latencies, 95):8.3f} ms"
+
+
+def main():
+    args = parse_args()
+    questions = load_questions(args.questions)
+    router = build_router()
+
+    by_language = {}
+    latencies = {"table": [], "rag": []}
+    for item in questions:
+        language = item.get("language", "en")
+        routed = router.route(item["question"], language) is not None
+        route = "table" if routed else "rag"
+        counts = by_language.setdefault(language, {"table": 0, "rag": 0})
+        counts[route] += 1
+        if args.verbose:
+            print(f"  {route:5s} {item['question']}")
+
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            router.route(item["question"], language)
+            latencies[route].append(time.perf_counter() - start)
+
+    total = len(questions)
+    routed = sum(counts["table"] for counts in by_language.values())
+    print(f"Routed to tables: {routed}/{total} ({routed / total:.0%}); full RAG + LLM: {total - routed}/{total}")
+    for language, counts in sorted(by_language.items()):
+        print(f"  {language}: {counts['table']} table, {counts['rag']} rag")
+    for route, values in latencies.items():
+        if values:
+            print(f"Router decision ({route:5s}): {percentiles(values)}")
+
+    misrouted = [question for question, language in NEGATIVE_QUESTIONS if router.route(question, language) is not None]
+    print(f"Non-schedule questions kept on RAG: {len(NEGATIVE_QUESTIONS) - len(misrouted)}/{len(NEGATIVE_QUESTIONS)}")
+    for question in misrouted:
+        print(f"  wrongly routed: {question}")
+
+    correct, routed_labelled = 0, 0
+    for question, language, expected in LABELLED_QUESTIONS:
+        response = router.route(question, language)
+        if response is None:
+            continue
+        routed_labelled += 1
+        listed = [line for line in response["answer"].split("\n") if line.startswith("- ")]
+        if len(listed) == len(expected) and all(any(name in line for line in listed) for name in expected):
+            correct += 1
+        else:
+            print(f"  wrong events for: {question}")
+    print(f"Labelled lookups routed: {routed_labelled}/{len(LABELLED_QUESTIONS)}, "
+          f"precision: {correct}/{routed_labelled} routed answers list exactly the expected events")
+
+    if args.chatbot:
+        from modules.chatbot_core import APECChatbot
+
+        ChatbotConfig.TABLE_ROUTING_ENABLED = True
+        chatbot = APECChatbot(api_key=ChatbotConfig.GOOGLE_API_KEY, persist_directory=ChatbotConfig.VECTOR_DB_PATH)
+        end_to_end = {"table": [], "rag": []}
+        for item in questions:
+            start = time.perf_counter()
+            response = chatbot.query(item["question"], auto_detect=False, preferred_language=item.get("language", "en"))
+            end_to_end[response.get("route") or "rag"].append(time.perf_counter() - start)
+        for route, values in end_to_end.items():
+            if values:
+                print(f"APECChatbot.query ({route:5s}, n={len(values):2d}): {percentiles(values)}")
+        print(json.dumps(chatbot.table_router.stats() if chatbot.table_router else {}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'api_backend'))
+
+import numpy as np
+from langchain_community.vectorstores import Chroma
+
+from mocks import HashingEmbeddingModel, MockChatModel
+from modules import chatbot_core
+from modules.config import ChatbotConfig
+
+QUESTIONS_PATH = os.path.join(os.path.dirname(__file__), 'requests.jsonl')
+CHUNKS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'processed', 'chunked_documents.json')
+
+
+class LoadTestChatbot(chatbot_core.APECChatbot):
+    """APECChatbot with an in-memory vector store built from the chunked documents"""
+
+    def open_vectorstore(self):
+        with open(CHUNKS_PATH, encoding='utf-8') as f:
+            chunks = json.load(f)
+        return Chroma.from_texts(
+            texts=[f"passage: {chunk['content']}" for chunk in chunks],
+            metadatas=[chunk['metadata'] for chunk in chunks],
+            embedding=self.embeddings,
+            collection_name="load_test"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test with a mock Gemini model")
+    parser.add_argument("--questions", default=QUESTIONS_PATH, help="JSONL file with one {\"question\": ...} per line")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per level (at least 4x the concurrency)")
+    parser.add_argument("--top-k", type=int, default=ChatbotConfig.DEFAULT_TOP_K)
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Mock LLM time to first token (seconds)")
+    parser.add_argument("--token-rate", type=float, default=50.0, help="Mock LLM tokens per second")
+    parser.add_argument("--mock-embeddings", action="store_true",
+                        help="Use a hashing stand-in for e5 and an in-memory vector store instead of the persisted one")
+    parser.add_argument("--embedding-latency", type=float, default=0.0, help="Per-call latency of the mock embeddings")
+    parser.add_argument("--semantic-cache", action="store_true", help="Keep the semantic answer cache enabled")
+    parser.add_argument("--coalescing", action="store_true", help="Keep request coalescing enabled on POST /chat")
+    parser.add_argument("--table-routing", action="store_true", help="Answer schedule/venue lookups from the table store")
+    parser.add_argument("--distinct-questions", type=int, help="Only use the first N questions (bursts of identical requests)")
+    parser.add_argument("--targets", default="query,api", help="Comma-separated paths to load: query (APECChatbot.query) and/or api (POST /chat)")
+    parser.add_argument("--api-url", help="Load a running server instead of the in-process ASGI app")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    return parser.parse_args()
+
+
+def load_questions(path):
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    questions = [row.get("question") or row.get("message") for row in rows]
+    return [question for question in questions if question]
+
+
+def build_chatbot(args):
+    """Create the chatbot with ChatGoogleGenerativeAI (and optionally e5) swapped for local stand-ins"""
+    chatbot_core.ChatGoogleGenerativeAI = lambda **kwargs: MockChatModel(
+        first_token_latency=args.llm_latency,
+        tokens_per_second=args.token_rate
+    )
+    ChatbotConfig.SEMANTIC_CACHE_ENABLED = args.semantic_cache
+    ChatbotConfig.REQUEST_COALESCING_ENABLED = args.coalescing
+    ChatbotConfig.TABLE_ROUTING_ENABLED = args.table_routing
+
+    if args.mock_embeddings:
+        model = HashingEmbeddingModel(latency=args.embedding_latency)
+        chatbot_core.get_embedding_model = lambda model_name, backend=None: model
+        return LoadTestChatbot(api_key="load-test")
+    return chatbot_core.APECChatbot(api_key="load-test", persist_directory=ChatbotConfig.VECTOR_DB_PATH)
+
+
+def memory_usage():
+    """Current and peak resident set size in MB"""
+    current = 0.0
+    if os.path.exists("/proc/self/statm"):
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rss_mb": round(current, 1), "peak_rss_mb": round(peak, 1)}
+
+
+def summarize(concurrency, results, wall_time):
+    latencies = np.array([latency for latency, ok, _ in results if ok]) * 1000
+    errors = sum(1 for _, ok, _ in results if not ok)
+    summary = {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": errors,
+        "routed_to_tables": sum(1 for _, ok, routed in results if ok and routed),
+        "wall_seconds": round(wall_time, 3),
+        "throughput_rps": round((len(results) - errors) / wall_time, 2),
+    }
+    if len(latencies):
+        summary.update({
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+            "mean_ms": round(float(latencies.mean()), 1),
+        })
+    summary.update(memory_usage())
+    return summary
+
+
+def run_query_level(chatbot, questions, concurrency, total, top_k):
+    def call(i):
+        start = time.perf_counter()
+        response = chatbot.query(questions[i % len(questions)], top_k=top_k)
+        ok = not response["answer"].startswith("Sorry, I encountered an error")
+        return time.perf_counter() - start, ok, response.get("route") == "table"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(call, range(total)))
+    return summarize(concurrency, results, time.perf_counter() - start)
+
+
+async def run_api_levels(args, questions, levels, app):
+    import httpx
+
+    if args.api_url:
+        transport, base_url, single_flight = None, args.api_url, None
+    else:
+        import api_backend
+        transport, base_url = httpx.ASGITransport(app=app), "http://load-test"
+        single_flight = api_backend.chat_single_flight
+
+    reports = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=300) as client:
+        for concurrency in levels:
+            total = max(args.requests, concurrency * 4)
+            slots = asyncio.Semaphore(concurrency)
+
+            async def call(i):
+                async with slots:
+                    start = time.perf_counter()
+                    response = await client.post("/chat", json={
+                        "message": questions[i % len(questions)],
+                        "top_k": args.top_k
+                    })
+                    ok = response.status_code == 200
+                    return time.perf_counter() - start, ok, ok and response.json().get("route") == "table"
+
+            start = time.perf_counter()
+            coalesced_before = single_flight.coalesced if single_flight else 0
+            results = await asyncio.gather(*(call(i) for i in range(total)))
+            reports.append(summarize(concurrency, results, time.perf_counter() - start))
+            if single_flight:
+                reports[-1]["coalesced_requests"] = single_flight.coalesced - coalesced_before
+            print(f"api   c={concurrency:3d}  {reports[-1]}", file=sys.stderr)
+    return reports
+
+
+def main():
+    args = parse_args()
+    questions = load_questions(args.questions)[:args.distinct_questions]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    targets = args.targets.split(",")
+
+    report = {
+        "config": {
+            "questions": len(questions),
+            "concurrency_levels": levels,
+            "requests_per_level": args.requests,
+            "top_k": args.top_k,
+            "llm_first_token_latency": args.llm_latency,
+            "llm_tokens_per_second": args.token_rate,
+            "mock_embeddings": args.mock_embeddings,
+            "semantic_cache": args.semantic_cache,
+            "request_coalescing": args.coalescing,
+            "table_routing": args.table_routing,
+        }
+    }
+
+    chatbot = None
+    if "query" in targets or not args.api_url:
+        start = time.perf_counter()
+        chatbot = build_chatbot(args)
+        report["startup_seconds"] = round(time.perf_counter() - start, 2)
+        report["memory_after_startup"] = memory_usage()
+
+    if "query" in targets:
+        report["query"] = []
+        for concurrency in levels:
+            total = max(args.requests, concurrency * 4)
+            report["query"].append(run_query_level(chatbot, questions, concurrency, total, args.top_k))
+            print(f"query c={concurrency:3d}  {report['query'][-1]}", file=sys.stderr)
+
+    if "api" in targets:
+        import api_backend
+        api_backend.chatbot = chatbot
+        report["api"] = asyncio.run(run_api_levels(args, questions, levels, api_backend.app))
+
+    report["memory"] = memory_usage()
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
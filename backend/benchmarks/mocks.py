@@ -0,0 +1,78 @@
+import hashlib
+import re
+import time
+from typing import Any, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+DEFAULT_ANSWER = (
+    "The Second Senior Officials' Meeting (SOM2) takes place in Jeju from May 3 to 16, 2025. "
+    "Related ministerial meetings such as MRT and HRDMM are held in Jeju during the same period. "
+    "Would you like the full meeting schedule? What else can I help you with?"
+)
+
+
+class MockChatModel(BaseChatModel):
+    """Local stand-in for ChatGoogleGenerativeAI with a fixed time to first token and token rate"""
+
+    answer: str = DEFAULT_ANSWER
+    first_token_latency: float = 0.3
+    tokens_per_second: float = 50.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "mock-chat"
+
+    def _tokens(self):
+        return re.findall(r"\S+\s*", self.answer)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tokens = self._tokens()
+        time.sleep(self.first_token_latency + len(tokens) / self.tokens_per_second)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self.answer))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self.first_token_latency)
+        for token in self._tokens():
+            time.sleep(1 / self.tokens_per_second)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class HashingEmbeddingModel:
+    """
+    Lightweight stand-in for the e5 SentenceTransformer: hashed bag-of-words vectors,
+    optionally with a fixed per-call latency to mimic model inference
+    """
+
+    def __init__(self, dimension=1024, latency=0.0):
+        self.dimension = dimension
+        self.latency = latency
+
+    def encode(self, texts, normalize_embeddings=True, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimension] += 1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.where(norms == 0, 1.0, norms)
+        return vectors
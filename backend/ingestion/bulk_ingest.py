@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.ingestion import StreamingIngestionPipeline, iter_scraped_pages, page_to_document
+from modules.retrievers import collection_fingerprint
+from modules.table_store import TableStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk ingest scraped pages with parallel chunking and resumable checkpoints")
+    parser.add_argument("--data", default=ChatbotConfig.SCRAPED_DATA_PATH, help="Scraped pages .json or .jsonl file")
+    parser.add_argument("--output-dir", default=ChatbotConfig.BULK_INGEST_OUTPUT_DIR,
+                        help="Directory for the appended vector file, ids and checkpoint")
+    parser.add_argument("--persist-dir", default=ChatbotConfig.VECTOR_DB_PATH, help="Chroma persist directory")
+    parser.add_argument("--no-vectorstore", action="store_true", help="Only write the vector file, skip Chroma upserts")
+    parser.add_argument("--batch-size", type=int, default=ChatbotConfig.BULK_INGEST_BATCH_SIZE, help="Chunks per embedding batch")
+    parser.add_argument("--workers", type=int, default=None, help="Chunking processes (default: CPU count)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from scratch")
+    parser.add_argument("--table-store", default=None,
+                        help="SQLite store of the parsed event tables (default: the served store when ingesting into "
+                             "the served collection, otherwise table_store.sqlite3 under --output-dir)")
+    parser.add_argument("--scale", type=int, default=1,
+                        help="Replay the corpus N times with distinct URLs to measure throughput at larger scale "
+                             "(needs --no-vectorstore or a scratch --persist-dir)")
+    args = parser.parse_args()
+    # The #copy-N duplicates must never land in the collection the chatbot serves
+    production_store = os.path.abspath(args.persist_dir) == os.path.abspath(ChatbotConfig.VECTOR_DB_PATH)
+    if args.scale > 1 and not args.no_vectorstore and production_store:
+        parser.error("--scale > 1 would upsert duplicate pages into the production vector store; "
+                     "pass --no-vectorstore or a scratch --persist-dir")
+
+    # The served table store is only rewritten alongside the served collection
+    args.serves_production = production_store and not args.no_vectorstore
+    production_tables = os.path.abspath(ChatbotConfig.TABLE_STORE_PATH)
+    if args.table_store is None:
+        args.table_store = production_tables if args.serves_production else os.path.join(args.output_dir, "table_store.sqlite3")
+    elif os.path.abspath(args.table_store) == production_tables and not args.serves_production:
+        parser.error("--table-store points at the served table store, but this run does not ingest into the served collection")
+    return args
+
+
+def scaled_pages(path, scale):
+    """Repeat the corpus with per-copy URLs so every copy produces distinct chunk ids"""
+    for copy in range(scale):
+        for page in iter_scraped_pages(path):
+            if copy:
+                page = dict(page, url=f"{page['url']}#copy-{copy}")
+            yield page
+
+
+def main():
+    args = parse_args()
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, ChatbotConfig.EMBEDDING_BACKEND))
+    collection = None
+    if not args.no_vectorstore:
+        collection = Chroma(persist_directory=args.persist_dir, embedding_function=embeddings)._collection
+
+    pipeline = StreamingIngestionPipeline(
+        embeddings,
+        args.output_dir,
+        collection=collection,
+        batch_size=args.batch_size,
+        workers=args.workers
+    )
+
+    start_time = time.time()
+    stats = pipeline.run(scaled_pages(args.data, args.scale), resume=not args.restart)
+    print(json.dumps(stats, indent=2))
+    print(f"Finished in {time.time() - start_time:.1f}s; vectors in {pipeline.vectors_path}")
+
+    # Event tables for the schedule/venue fast path (one pass over the original pages is enough)
+    store = TableStore.build(
+        args.table_store,
+        (page_to_document(page) for page in iter_scraped_pages(args.data)),
+        fingerprint=collection_fingerprint(collection) if collection is not None else None
+    )
+    print(f"Table store at {args.table_store} holds {len(store)} events")
+
+
+if __name__ == "__main__":
+    main()
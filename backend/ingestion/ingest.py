@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from langchain_community.vectorstores import Chroma
+
+from modules.config import ChatbotConfig
+from modules.embeddings import E5Embeddings, get_embedding_model
+from modules.ingestion import IncrementalIndexer, load_scraped_pages, page_to_document
+from modules.retrievers import collection_fingerprint
+from modules.table_store import TableStore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incrementally sync scraped APEC pages into the vector store")
+    parser.add_argument("--data", default=ChatbotConfig.SCRAPED_DATA_PATH, help="Scraped pages JSON file")
+    parser.add_argument("--persist-dir", default=ChatbotConfig.VECTOR_DB_PATH, help="Chroma persist directory")
+    parser.add_argument("--manifest", default=ChatbotConfig.INGEST_MANIFEST_PATH, help="Page/chunk hash manifest")
+    parser.add_argument("--table-store", default=ChatbotConfig.TABLE_STORE_PATH, help="SQLite store of the parsed event tables")
+    parser.add_argument("--batch-size", type=int, default=100, help="Chunks per embedding/upsert batch")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--delete-unmanaged", action="store_true",
+                        help="Delete chunks that were not created by this pipeline (e.g. the notebook-built store)")
+    parser.add_argument("--reload-url", help="Base URL of a running API to hot-reload, e.g. http://localhost:8000")
+    return parser.parse_args()
+
+
+def reload_running_api(base_url):
+    import requests
+
+    headers = {"X-Admin-Token": ChatbotConfig.ADMIN_TOKEN} if ChatbotConfig.ADMIN_TOKEN else {}
+    response = requests.post(f"{base_url.rstrip('/')}/admin/reload", headers=headers, timeout=300)
+    if response.status_code == 200:
+        print(f"API reloaded: {response.json()}")
+    else:
+        print(f"API reload failed ({response.status_code}): {response.text}")
+
+
+def main():
+    args = parse_args()
+
+    pages = load_scraped_pages(args.data)
+    print(f"Loaded {len(pages)} scraped pages from {args.data}")
+
+    embeddings = E5Embeddings(get_embedding_model(ChatbotConfig.EMBEDDING_MODEL, ChatbotConfig.EMBEDDING_BACKEND))
+    vectorstore = Chroma(persist_directory=args.persist_dir, embedding_function=embeddings)
+    indexer = IncrementalIndexer(vectorstore._collection, embeddings, args.manifest, batch_size=args.batch_size)
+
+    stats = indexer.sync(pages, dry_run=args.dry_run, delete_unmanaged=args.delete_unmanaged)
+    print(json.dumps(stats, indent=2))
+    print(f"Collection now holds {vectorstore._collection.count()} chunks")
+
+    if not args.dry_run:
+        # Event tables for the schedule/venue fast path, parsed from the same cleaned pages
+        store = TableStore.build(
+            args.table_store,
+            [page_to_document(page) for page in pages],
+            fingerprint=collection_fingerprint(vectorstore._collection)
+        )
+        print(f"Table store now holds {len(store)} events")
+
+    if args.reload_url and not args.dry_run:
+        reload_running_api(args.reload_url)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,50 @@
 
-from .chatbot_core import APECChatbot
-from .config import ChatbotConfig
-from .utils import (
-    detect_language,
-    get_language_flag,
-    create_welcome_message,
-    validate_environment,
-    get_context_suggestions,
-    get_hardcoded_suggestions,
-    generate_llm_suggestions
-)
-from .ui_components import (
-    render_sidebar,
-    render_chat_message,
-    render_sources_expander,
-    render_response_metadata,
-    initialize_chat_history,
-    render_chat_input,
-    show_typing_indicator,
-    render_error_message,
-    render_success_message,
-    render_info_message
-)
+import importlib
+
+# Names are resolved on first access (PEP 562), so "from modules.config import ..." in the API
+# process does not drag in Streamlit, LangChain or sentence-transformers
+_LAZY_EXPORTS = {
+    'APECChatbot': 'chatbot_core',
+    'ChatbotConfig': 'config',
+    'E5Embeddings': 'embeddings',
+    'get_embedding_model': 'embeddings',
+    'detect_language': 'utils',
+    'get_language_flag': 'utils',
+    'create_welcome_message': 'utils',
+    'validate_environment': 'utils',
+    'get_context_suggestions': 'utils',
+    'get_hardcoded_suggestions': 'utils',
+    'generate_llm_suggestions': 'utils',
+    'start_llm_suggestions': 'utils',
+    'is_llm_suggestions_pending': 'utils',
+    'combine_suggestions': 'utils',
+    'render_sidebar': 'ui_components',
+    'render_chat_message': 'ui_components',
+    'render_sources_expander': 'ui_components',
+    'render_response_metadata': 'ui_components',
+    'initialize_chat_history': 'ui_components',
+    'render_chat_input': 'ui_components',
+    'show_typing_indicator': 'ui_components',
+    'render_error_message': 'ui_components',
+    'render_success_message': 'ui_components',
+    'render_info_message': 'ui_components'
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     'APECChatbot',
     'ChatbotConfig',
+    'E5Embeddings',
+    'get_embedding_model',
     'detect_language',
     'get_language_flag',
     'create_welcome_message',
@@ -33,6 +52,9 @@ __all__ = [
     'get_context_suggestions',
     'get_hardcoded_suggestions',
     'generate_llm_suggestions',
+    'start_llm_suggestions',
+    'is_llm_suggestions_pending',
+    'combine_suggestions',
     'render_sidebar',
     'render_chat_message',
     'render_sources_expander',
@@ -0,0 +1,312 @@
+import json
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticCache:
+    """Answer cache keyed on normalized query embeddings, with LRU/TTL eviction and a memory cap"""
+
+    def __init__(self, similarity_threshold=0.95, max_entries=1000, ttl_seconds=3600, max_memory_mb=64):
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = int(max_memory_mb * 1024 * 1024)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        # One preallocated row per entry (allocated on the first store, once the dimension is known);
+        # a row's key is -1 while it is free, its scope hash picks the candidates of a lookup
+        self._matrix = None
+        self._row_keys = np.full(max_entries, -1, dtype=np.int64)
+        self._row_scopes = np.zeros(max_entries, dtype=np.int64)
+        self._free_rows = list(range(max_entries - 1, -1, -1))
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.fingerprint = None
+
+    def lookup(self, embedding, scope):
+        """Return the cached response whose query is most similar to embedding within scope, or None"""
+        query_vector = self._normalize(embedding)
+        scope_hash = hash(scope)
+
+        with self._lock:
+            self._expire(time.time())
+            matrix = self._matrix
+            candidates = (self._row_keys >= 0) & (self._row_scopes == scope_hash)
+
+        best_row = None
+        if matrix is not None and matrix.shape[1] == query_vector.shape[0] and candidates.any():
+            # Scored outside the lock; a row rewritten meanwhile is caught by the re-check below
+            scores = np.where(candidates, matrix @ query_vector, -1.0)
+            best_row = int(np.argmax(scores))
+
+        with self._lock:
+            key = int(self._row_keys[best_row]) if best_row is not None else -1
+            entry = self._entries.get(key)
+            if (entry is None or entry["scope"] != scope
+                    or float(self._matrix[best_row] @ query_vector) < self.similarity_threshold):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return dict(entry["response"])
+
+    def store(self, embedding, scope, response):
+        """Add a response to the cache, evicting least recently used entries as needed"""
+        vector = self._normalize(embedding)
+        size = vector.nbytes + len(json.dumps(response, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_memory_bytes or self.max_entries < 1:
+            return
+
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            if vector.shape[0] != self._matrix.shape[1]:
+                return
+
+            while self._entries and (not self._free_rows or self.memory_bytes + size > self.max_memory_bytes):
+                self._pop_oldest()
+
+            key = self._next_id
+            self._next_id += 1
+            row = self._free_rows.pop()
+            self._matrix[row] = vector
+            self._row_scopes[row] = hash(scope)
+            self._row_keys[row] = key
+            self._entries[key] = {
+                "row": row,
+                "scope": scope,
+                "response": dict(response),
+                "created": time.time(),
+                "size": size
+            }
+            self.memory_bytes += size
+
+    def check_fingerprint(self, fingerprint):
+        """Invalidate the cache when the underlying collection fingerprint changes"""
+        with self._lock:
+            if fingerprint == self.fingerprint:
+                return
+            if self.fingerprint is not None:
+                self._clear()
+                self.invalidations += 1
+            self.fingerprint = fingerprint
+
+    def invalidate(self):
+        with self._lock:
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self.memory_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def _normalize(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self, now):
+        # Entries are kept in insertion/recency order, but TTL is based on creation time
+        expired = [key for key, entry in self._entries.items() if now - entry["created"] > self.ttl_seconds]
+        for key in expired:
+            self._release(self._entries.pop(key))
+            self.evictions += 1
+
+    def _pop_oldest(self):
+        _, entry = self._entries.popitem(last=False)
+        self._release(entry)
+        self.evictions += 1
+
+    def _release(self, entry):
+        self.memory_bytes -= entry["size"]
+        self._row_keys[entry["row"]] = -1
+        self._free_rows.append(entry["row"])
+
+    def _clear(self):
+        self._entries.clear()
+        self._row_keys[:] = -1
+        self._free_rows = list(range(self.max_entries - 1, -1, -1))
+        self.memory_bytes = 0
+
+
+def normalize_query_text(text):
+    """Canonical form used as the exact-match key (Unicode NFC, collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class QueryEmbeddingCache:
+    """Exact-match LRU cache of query embeddings with an optional memory-mapped on-disk tier"""
+
+    def __init__(self, max_entries=2048, disk_dir=None, disk_capacity=100000, model_name=""):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_capacity = disk_capacity
+        self.model_name = model_name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.encodes = 0
+        self.encode_seconds = 0.0
+
+        # Disk tier: a ring of rows in a .npy memmap plus an append-only key log
+        self._disk_vectors = None
+        self._disk_rows = {}
+        self._disk_keys = {}
+        self._disk_next_row = 0
+        self._disk_log_lines = 0
+        if disk_dir:
+            self._load_disk()
+
+    def get(self, text):
+        """Return the cached embedding for text, or None"""
+        key = normalize_query_text(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return vector
+
+            row = self._disk_rows.get(key)
+            if row is not None:
+                vector = np.array(self._disk_vectors[row])
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text, vector, encode_seconds=0.0):
+        """Store a freshly encoded embedding and the time it took to compute"""
+        key = normalize_query_text(text)
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            self.encodes += 1
+            self.encode_seconds += encode_seconds
+            self._remember(key, vector)
+            if self.disk_dir and key not in self._disk_rows:
+                self._write_disk(key, vector)
+
+    def stats(self):
+        with self._lock:
+            hits = self.hits + self.disk_hits
+            total = hits + self.misses
+            avg_encode = self.encode_seconds / self.encodes if self.encodes else 0.0
+            return {
+                "entries": len(self._entries),
+                "disk_entries": len(self._disk_rows),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / total, 4) if total else 0.0,
+                "avg_encode_ms": round(avg_encode * 1000, 2),
+                "saved_encode_seconds": round(hits * avg_encode, 3)
+            }
+
+    def _remember(self, key, vector):
+        self._entries[key] = vector
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load_disk(self):
+        os.makedirs(self.disk_dir, exist_ok=True)
+        meta_path = os.path.join(self.disk_dir, "meta.json")
+        vectors_path = os.path.join(self.disk_dir, "vectors.npy")
+        keys_path = os.path.join(self.disk_dir, "keys.jsonl")
+
+        if not (os.path.exists(meta_path) and os.path.exists(vectors_path)):
+            return
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            vectors = np.load(vectors_path, mmap_mode="r+")
+        except (OSError, ValueError):
+            # A truncated meta or vector file (e.g. a crash mid-write) just means an empty cache
+            meta, vectors = {}, None
+        if vectors is None or meta.get("model") != self.model_name:
+            # Embeddings from another model (or unreadable ones) are useless, start over
+            for path in (meta_path, vectors_path, keys_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+
+        self._disk_vectors = vectors
+        self.disk_capacity = self._disk_vectors.shape[0]
+        written = 0
+        if os.path.exists(keys_path):
+            with open(keys_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        row, key = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._assign_row(row, key)
+                    written += 1
+        self._disk_log_lines = written
+        self._disk_next_row = meta.get("next_row", written % self.disk_capacity)
+
+    def _write_disk(self, key, vector):
+        if self._disk_vectors is None:
+            self._disk_vectors = np.lib.format.open_memmap(
+                os.path.join(self.disk_dir, "vectors.npy"),
+                mode="w+",
+                dtype=np.float32,
+                shape=(self.disk_capacity, vector.shape[0])
+            )
+        if vector.shape[0] != self._disk_vectors.shape[1]:
+            return
+
+        row = self._disk_next_row
+        self._disk_vectors[row] = vector
+        self._disk_vectors.flush()
+        self._assign_row(row, key)
+        self._disk_next_row = (row + 1) % self.disk_capacity
+
+        keys_path = os.path.join(self.disk_dir, "keys.jsonl")
+        self._disk_log_lines += 1
+        if self._disk_log_lines > 2 * self.disk_capacity:
+            # Compact the key log once overwritten rows dominate it
+            with open(f"{keys_path}.tmp", "w", encoding="utf-8") as f:
+                for live_row, live_key in self._disk_keys.items():
+                    f.write(json.dumps([live_row, live_key], ensure_ascii=False) + "\n")
+            os.replace(f"{keys_path}.tmp", keys_path)
+            self._disk_log_lines = len(self._disk_keys)
+        else:
+            with open(keys_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps([row, key], ensure_ascii=False) + "\n")
+        # Replaced atomically, so a crash mid-write never leaves a truncated meta.json behind
+        meta_path = os.path.join(self.disk_dir, "meta.json")
+        with open(f"{meta_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"model": self.model_name, "next_row": self._disk_next_row}, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def _assign_row(self, row, key):
+        # Rows are reused as a ring, so drop whichever key previously lived there
+        old_key = self._disk_keys.pop(row, None)
+        if old_key is not None:
+            self._disk_rows.pop(old_key, None)
+        self._disk_rows[key] = row
+        self._disk_keys[row] = key
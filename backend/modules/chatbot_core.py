@@ -1,16 +1,27 @@
 
 import os
-
-# RAG components
-from sentence_transformers import SentenceTransformer
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Langchain components
 from langchain.prompts import PromptTemplate
-from langchain.chains import RetrievalQA
+from langchain.schema import Document
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from .batching import MicroBatcher
+from .cache import QueryEmbeddingCache, SemanticCache
+from .config import ChatbotConfig
+from .context import ContextBuilder, PackedContextRetriever, estimate_tokens
+from .embeddings import E5Embeddings, get_embedding_model
+from .filters import MetadataFilter, MetadataIndex
+from .lexical import BM25Index, HybridRetriever
+from .reranking import CrossEncoderReranker, RerankingRetriever, get_cross_encoder
+from .retrievers import EmptyRetriever, NumpyRetriever, NumpyVectorIndex, QuantizedVectorIndex, collection_fingerprint
+from .routing import TableQueryRouter
+from .table_store import TableStore
+from .tracing import count_cache_event, count_query_route, observe_prompt_tokens, request_trace, span
 from .utils import detect_language
 
 
@@ -19,35 +30,314 @@ class APECChatbot:
         self.api_key = api_key
         self.persist_directory = persist_directory
         self.vectorstore = None
+        self.vector_index = None
+        self.lexical_index = None
+        self._lexical_lock = threading.Lock()
+        self.metadata_index = None
+        self._metadata_lock = threading.Lock()
         self.llm = None
         self.embedding_model = None
         self.embeddings = None
+        self.query_embedding_cache = None
+        self.embedding_batcher = None
+        self.reranker = None
+        self.context_builder = None
+        self.table_router = None
+        self.prompts = {}
+        self.retrievers = {}
+        self._retriever_lock = threading.Lock()
+        self.semantic_cache = None
+        self._fingerprint_checked_at = 0.0
+        self.startup_timings = {}
         self.setup_models()
+        self.setup_cache()
+        self.setup_retrievers()
         
     def setup_models(self):
         try:
-            self.embedding_model = SentenceTransformer("intfloat/multilingual-e5-large")
-            
-            # Langchain wrapper for embeddings
-            self.embeddings = SentenceTransformerEmbeddings(model_name="intfloat/multilingual-e5-large")
-            
-            # Load vector store
-            if os.path.exists(self.persist_directory) and os.listdir(self.persist_directory):
-                self.vectorstore = Chroma(persist_directory=self.persist_directory, embedding_function=self.embeddings)
-            else:
-                raise Exception("Vector store not found! Please run the RAG setup first.")
-            
-            #Gemini LLM
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.0-flash",
-                temperature=0.1,
-                convert_system_message_to_human=True,
-                google_api_key=self.api_key
+            # Repeated queries are served from cache in front of the shared e5 model
+            self.query_embedding_cache = QueryEmbeddingCache(
+                max_entries=ChatbotConfig.QUERY_EMBEDDING_CACHE_SIZE,
+                disk_dir=ChatbotConfig.QUERY_EMBEDDING_CACHE_DIR,
+                disk_capacity=ChatbotConfig.QUERY_EMBEDDING_CACHE_DISK_CAPACITY,
+                model_name=f"{ChatbotConfig.EMBEDDING_MODEL}:{ChatbotConfig.EMBEDDING_BACKEND}"
             )
+
+            # Independent components load concurrently: the e5 weights (one shared copy per process),
+            # the optional cross-encoder, the Gemini client and the vector store with its NumPy export
+            workers = 4 if ChatbotConfig.PARALLEL_STARTUP else 1
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chatbot-startup") as executor:
+                model_future = executor.submit(
+                    self.timed_load, "embedding_model",
+                    get_embedding_model, ChatbotConfig.EMBEDDING_MODEL, ChatbotConfig.EMBEDDING_BACKEND
+                )
+                # Anything that encodes before the model is ready simply waits for it
+                self.embeddings = E5Embeddings(model_future, query_cache=self.query_embedding_cache)
+
+                reranker_future = None
+                if ChatbotConfig.RERANK_ENABLED:
+                    reranker_future = executor.submit(self.timed_load, "reranker", get_cross_encoder, ChatbotConfig.RERANK_MODEL)
+                llm_future = executor.submit(self.timed_load, "llm", self.create_llm)
+                stores_future = executor.submit(self.timed_load, "vectorstore", self.open_stores)
+
+                self.embedding_model = model_future.result()
+                if reranker_future is not None:
+                    # Second stage that re-scores retrieved candidates with a cross-encoder
+                    self.reranker = CrossEncoderReranker(
+                        reranker_future.result(),
+                        batch_size=ChatbotConfig.RERANK_BATCH_SIZE,
+                        cache_size=ChatbotConfig.RERANK_CACHE_SIZE
+                    )
+                self.llm = llm_future.result()
+                self.vectorstore, self.vector_index = stores_future.result()
+
+            # Concurrent requests share e5 forward passes instead of encoding one sentence each
+            if ChatbotConfig.EMBEDDING_BATCHING_ENABLED:
+                self.embedding_batcher = MicroBatcher(
+                    self.embeddings.embed_documents,
+                    max_batch_size=ChatbotConfig.EMBEDDING_BATCH_MAX_SIZE,
+                    max_wait_ms=ChatbotConfig.EMBEDDING_BATCH_MAX_WAIT_MS
+                )
+                self.embeddings.batcher = self.embedding_batcher
+            
+            # Token-budgeted packing of the retrieved chunks before they reach the prompt
+            if ChatbotConfig.CONTEXT_PACKING_ENABLED:
+                self.context_builder = ContextBuilder(
+                    max_tokens=ChatbotConfig.CONTEXT_TOKEN_BUDGET,
+                    table_max_rows=ChatbotConfig.CONTEXT_TABLE_MAX_ROWS,
+                    chars_per_token=ChatbotConfig.CONTEXT_CHARS_PER_TOKEN
+                )
+
+            # Schedule/venue lookups answered straight from the event tables parsed at ingestion
+            if ChatbotConfig.TABLE_ROUTING_ENABLED:
+                self.table_router = self.timed_load("table_store", self.create_table_router)
             
         except Exception as e:
             raise Exception(f"Error initializing models: {str(e)}")
+
+    def timed_load(self, name, fn, *args):
+        """Run one startup step and record how long it took in startup_timings"""
+        start = time.perf_counter()
+        result = fn(*args)
+        self.startup_timings[name] = round(time.perf_counter() - start, 3)
+        return result
+
+    def create_llm(self):
+        #Gemini LLM
+        return ChatGoogleGenerativeAI(
+            model="gemini-2.0-flash",
+            temperature=0.1,
+            convert_system_message_to_human=True,
+            google_api_key=self.api_key
+        )
+
+    def create_table_router(self, rebuild=False):
+        """
+        Open the table store written by ingestion, (re)building it from the indexed chunks if it
+        is missing or was built against a different version of the collection
+        """
+        fingerprint = self.get_index_fingerprint()
+        store = None
+        if not rebuild and os.path.exists(ChatbotConfig.TABLE_STORE_PATH):
+            store = TableStore(ChatbotConfig.TABLE_STORE_PATH)
+            if store.source_fingerprint() != fingerprint:
+                store.close()
+                store = None
+        if store is None:
+            store = TableStore.build(ChatbotConfig.TABLE_STORE_PATH, self.get_chunk_documents(), fingerprint=fingerprint)
+        return TableQueryRouter(store, max_rows=ChatbotConfig.TABLE_ROUTING_MAX_ROWS)
+
+    def get_index_fingerprint(self):
+        """Fingerprint of the collection being served (taken from the vector index export if there is one)"""
+        if self.vector_index is not None:
+            return self.vector_index.fingerprint
+        return collection_fingerprint(self.vectorstore._collection)
+
+    def open_stores(self):
+        """Open the vector store and, for the numpy/int8/binary backends, its memory-mapped export"""
+        vectorstore = self.open_vectorstore()
+        return vectorstore, self.open_vector_index(vectorstore._collection)
+
+    def open_vector_index(self, collection, export=False):
+        """
+        Optional in-process index over an export of the collection: "numpy" searches the float
+        matrix exactly, "int8"/"binary" search quantized codes and rescore with the float matrix
+        """
+        backend = ChatbotConfig.RETRIEVER_BACKEND
+        if backend == "numpy":
+            index_cls, options = NumpyVectorIndex, {}
+        elif backend in QuantizedVectorIndex.MODES:
+            index_cls = QuantizedVectorIndex
+            multiplier = ChatbotConfig.INT8_RESCORE_MULTIPLIER if backend == "int8" else ChatbotConfig.BINARY_RESCORE_MULTIPLIER
+            options = {"mode": backend, "rescore_multiplier": multiplier}
+        else:
+            return None
+
+        # Re-exporting replaces the files atomically, so readers of the old matrix are unaffected
+        loader = index_cls.export if export else index_cls.load_or_export
+        return loader(ChatbotConfig.NUMPY_INDEX_PATH, collection, dtype=ChatbotConfig.NUMPY_INDEX_DTYPE, **options)
+
+    def open_vectorstore(self):
+        if os.path.exists(self.persist_directory) and os.listdir(self.persist_directory):
+            return Chroma(persist_directory=self.persist_directory, embedding_function=self.embeddings)
+        raise Exception("Vector store not found! Please run the RAG setup first.")
+
+    def reload_vectorstore(self):
+        """Re-open the vector store after re-indexing and swap it in without restarting the process"""
+        try:
+            # Chroma caches one client per path; drop it so the new client reads the updated index
+            from chromadb.api.client import SharedSystemClient
+            SharedSystemClient.clear_system_cache()
+        except (ImportError, AttributeError):
+            pass
+
+        vectorstore = self.open_vectorstore()
+        vector_index = self.open_vector_index(vectorstore._collection, export=True)
+
+        # In-flight queries keep using the retrievers they already hold
+        rebuild_lexical = self.lexical_index is not None
+        with self._retriever_lock:
+            self.vectorstore = vectorstore
+            self.vector_index = vector_index
+            self.lexical_index = None
+            self.metadata_index = None
+            self.retrievers = {}
+
+        if self.semantic_cache is not None:
+            self.semantic_cache.invalidate()
+        self.setup_retrievers()
+        if rebuild_lexical:
+            self.get_lexical_index()
+        if self.table_router is not None:
+            self.table_router = self.create_table_router(rebuild=True)
+        return self.get_collection_count()
+
+    def setup_cache(self):
+        """Create the semantic answer cache in front of retrieval and the LLM"""
+        if ChatbotConfig.SEMANTIC_CACHE_ENABLED:
+            self.semantic_cache = SemanticCache(
+                similarity_threshold=ChatbotConfig.SEMANTIC_CACHE_THRESHOLD,
+                max_entries=ChatbotConfig.SEMANTIC_CACHE_MAX_ENTRIES,
+                ttl_seconds=ChatbotConfig.SEMANTIC_CACHE_TTL,
+                max_memory_mb=ChatbotConfig.SEMANTIC_CACHE_MAX_MB
+            )
+
+    def setup_retrievers(self):
+        """Build the prompts once and pre-build the retriever used by default queries"""
+        self.prompts = {
+            language: self.get_language_specific_prompt(language)
+            for language in ChatbotConfig.SUPPORTED_LANGUAGES
+        }
+        self.get_cached_retriever(ChatbotConfig.DEFAULT_SEARCH_TYPE, ChatbotConfig.DEFAULT_TOP_K)
+
+    def get_retriever(self, search_type, top_k, metadata_filter=None):
+        """Return a retriever for the given settings, with optional reranking and context packing on top"""
+        if self.reranker is None:
+            retriever = self.get_base_retriever(search_type, top_k, metadata_filter)
+        else:
+            retriever = RerankingRetriever(
+                base_retriever=self.get_base_retriever(search_type, self.get_rerank_candidates(top_k), metadata_filter),
+                reranker=self.reranker,
+                k=top_k
+            )
+        if self.context_builder is not None:
+            retriever = PackedContextRetriever(base_retriever=retriever, context_builder=self.context_builder)
+        return retriever
+
+    def get_rerank_candidates(self, top_k):
+        """Number of first-stage candidates handed to the reranker"""
+        return max(ChatbotConfig.RERANK_CANDIDATES, top_k)
+
+    def get_base_retriever(self, search_type, top_k, metadata_filter=None):
+        """
+        Return a retriever from the configured backend (see ChatbotConfig.RETRIEVER_BACKEND).
+        A metadata filter is resolved to candidate rows (or a Chroma `where`) before any scoring.
+        """
+        rows = None
+        if metadata_filter is not None:
+            rows = self.get_metadata_index().rows(metadata_filter)
+            if len(rows) == 0:
+                return EmptyRetriever()
+
+        if search_type == "hybrid":
+            candidate_k = top_k * ChatbotConfig.HYBRID_CANDIDATE_MULTIPLIER
+            return HybridRetriever(
+                dense_retriever=self.get_base_retriever("similarity", candidate_k, metadata_filter),
+                lexical_index=self.get_lexical_index(),
+                k=top_k,
+                candidate_k=candidate_k,
+                rrf_k=ChatbotConfig.RRF_K,
+                rows=rows
+            )
+        if self.vector_index is not None and search_type == "similarity":
+            return NumpyRetriever(index=self.vector_index, embedding_function=self.embeddings, k=top_k, rows=rows)
+
+        search_kwargs = {"k": top_k}
+        if metadata_filter is not None:
+            search_kwargs["filter"] = self.get_metadata_index().chroma_where(metadata_filter)
+        return self.vectorstore.as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+
+    def get_chunk_documents(self):
+        """All chunks in row order of the vector index (or of the Chroma collection)"""
+        if self.vector_index is not None:
+            return self.vector_index.documents
+        data = self.vectorstore._collection.get(include=["documents", "metadatas"])
+        return [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(data["documents"], data["metadatas"])
+        ]
+
+    def get_lexical_index(self):
+        """Load (or build on first use) the BM25 index over the same chunks as the vector store"""
+        if self.lexical_index is not None:
+            return self.lexical_index
+
+        with self._lexical_lock:
+            if self.lexical_index is None:
+                self.lexical_index = BM25Index.load_or_build(ChatbotConfig.LEXICAL_INDEX_PATH, self.get_chunk_documents())
+        return self.lexical_index
+
+    def get_metadata_index(self):
+        """Build on first use the metadata posting lists used for filtered retrieval"""
+        if self.metadata_index is not None:
+            return self.metadata_index
+
+        with self._metadata_lock:
+            if self.metadata_index is None:
+                # Rows must line up with the lexical index, which is keyed by the same chunk order
+                if self.lexical_index is not None:
+                    documents = self.lexical_index.documents
+                else:
+                    documents = self.get_chunk_documents()
+                self.metadata_index = MetadataIndex.from_documents(documents)
+        return self.metadata_index
+
+    def get_prompt(self, language):
+        """Return the pre-built prompt for a language"""
+        return self.prompts.get(language) or self.get_language_specific_prompt(language)
+
+    def get_cached_retriever(self, search_type="similarity", top_k=5):
+        """Look up a reusable retriever keyed by (search_type, top_k), building it on first use"""
+        key = (search_type, top_k)
+        retriever = self.retrievers.get(key)
+        if retriever is not None:
+            return retriever
+
+        with self._retriever_lock:
+            retriever = self.retrievers.get(key)
+            if retriever is None:
+                retriever = self.get_retriever(search_type, top_k)
+                # Unusual settings are served but not kept, so the registry stays bounded
+                if len(self.retrievers) < ChatbotConfig.MAX_CACHED_RETRIEVERS:
+                    self.retrievers[key] = retriever
+        return retriever
     
+    def get_request_retriever(self, search_type, top_k, metadata_filter=None):
+        """The pre-built retriever, or for filtered requests (too varied to keep) a fresh one"""
+        if metadata_filter is None:
+            return self.get_cached_retriever(search_type, top_k)
+        return self.get_retriever(search_type, top_k, metadata_filter)
+
     def get_language_specific_prompt(self, language):
         if language == 'vi':
             vietnamese_template = """Bạn là trợ lý AI chuyên về APEC 2025 Korea và các thông tin liên quan đến du lịch, văn hóa Việt Nam.
@@ -93,59 +383,328 @@ class APECChatbot:
             return PromptTemplate(template=english_template,input_variables=["context", "question"])
     
     def query(self, question, top_k=5, auto_detect=True, preferred_language="vi", **kwargs):
+        with request_trace() as trace:
+            try:
+                # Detect language based on settings
+                with span("language_detection"):
+                    if auto_detect:
+                        detected_language = detect_language(question)
+                    else:
+                        detected_language = preferred_language
+                
+                search_type = kwargs.get("search_type", ChatbotConfig.DEFAULT_SEARCH_TYPE)
+                metadata_filter = MetadataFilter.from_dict(kwargs.get("filters"))
+                search_question = f"query: {question}"
+
+                # Schedule/venue lookups skip retrieval and the LLM entirely
+                routed_response = self.route_to_tables(question, detected_language, metadata_filter)
+
+                # Near-duplicate questions are answered from the semantic cache
+                scope = self.get_cache_scope(detected_language, search_type, top_k, metadata_filter)
+                query_embedding, cached_response = None, None
+                if routed_response is None:
+                    query_embedding, cached_response = self.lookup_cached_answer(search_question, scope)
+
+                if routed_response is not None:
+                    response = routed_response
+                elif cached_response is not None:
+                    response = cached_response
+                else:
+                    if query_embedding is None:
+                        # Embed up front (the retriever then hits the query cache) so retrieval is timed on its own
+                        with span("query_embedding"):
+                            self.embeddings.embed_query(search_question)
+
+                    # Retrieve, fill the prompt and call the LLM one step at a time so each stage is traced
+                    retriever = self.get_request_retriever(search_type, top_k, metadata_filter)
+                    with span("retrieval"):
+                        docs = retriever.get_relevant_documents(search_question)
+                    with span("prompt_build"):
+                        prompt = self.build_prompt(detected_language, docs, search_question)
+                    with span("llm"):
+                        result = self.llm.invoke(prompt)
+                    
+                    sources = self.format_sources(docs)
+                    
+                    response = {
+                        "answer": result.content if hasattr(result, 'content') else str(result),
+                        "sources": sources,
+                        "num_sources": len(sources),
+                        "detected_language": detected_language
+                    }
+
+                    if query_embedding is not None:
+                        self.semantic_cache.store(query_embedding, scope, response)
+                
+            except Exception as e:
+                response = {
+                    "answer": f"Sorry, I encountered an error: {str(e)}",
+                    "sources": [],
+                    "num_sources": 0,
+                    "detected_language": "en"
+                }
+
+        if trace.timings is not None:
+            response = dict(response, timing=trace.timings)
+        return response
+    
+    def stream_query(self, question, top_k=5, auto_detect=True, preferred_language="vi", **kwargs):
+        """Yield a metadata event once retrieval is done, then the answer token by token"""
         try:
-            # Detect language based on settings
             if auto_detect:
                 detected_language = detect_language(question)
             else:
                 detected_language = preferred_language
-            
-            # Get prompt
-            language_prompt = self.get_language_specific_prompt(detected_language)
-            
-            # Create chain with prompt
-            temp_qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=self.vectorstore.as_retriever(
-                    search_type=kwargs.get("search_type", "similarity"),
-                    search_kwargs={"k": top_k}
-                ),
-                chain_type_kwargs={"prompt": language_prompt},
-                return_source_documents=True
-            )
-            
+
+            search_type = kwargs.get("search_type", ChatbotConfig.DEFAULT_SEARCH_TYPE)
+            metadata_filter = MetadataFilter.from_dict(kwargs.get("filters"))
             search_question = f"query: {question}"
-            result = temp_qa_chain({"query": search_question})
-            
-            # Process sources
-            sources = []
-            for doc in result["source_documents"]:
-                source_info = {
-                    "title": doc.metadata.get("title", "Unknown"),
-                    "url": doc.metadata.get("url", ""),
-                    "contains_table": doc.metadata.get("contains_table", False),
-                    "chunk_length": doc.metadata.get("chunk_length", 0),
-                    "content_preview": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
+
+            scope = self.get_cache_scope(detected_language, search_type, top_k, metadata_filter)
+            cached_response = self.route_to_tables(question, detected_language, metadata_filter)
+            query_embedding = None
+            if cached_response is None:
+                query_embedding, cached_response = self.lookup_cached_answer(search_question, scope)
+            if cached_response is not None:
+                yield {
+                    "type": "metadata",
+                    "sources": cached_response["sources"],
+                    "num_sources": cached_response["num_sources"],
+                    "detected_language": cached_response["detected_language"]
                 }
-                sources.append(source_info)
-            
-            response = {
-                "answer": result["result"],
+                yield {"type": "token", "content": cached_response["answer"]}
+                yield {"type": "done", "answer": cached_response["answer"]}
+                return
+
+            retriever = self.get_request_retriever(search_type, top_k, metadata_filter)
+            docs = retriever.get_relevant_documents(search_question)
+            sources = self.format_sources(docs)
+
+            yield {
+                "type": "metadata",
                 "sources": sources,
                 "num_sources": len(sources),
                 "detected_language": detected_language
             }
-            
-            return response
-            
+
+            prompt = self.build_prompt(detected_language, docs, search_question)
+
+            answer_parts = []
+            for chunk in self.llm.stream(prompt):
+                token = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                if token:
+                    answer_parts.append(token)
+                    yield {"type": "token", "content": token}
+
+            answer = "".join(answer_parts)
+            if query_embedding is not None:
+                self.semantic_cache.store(query_embedding, scope, {
+                    "answer": answer,
+                    "sources": sources,
+                    "num_sources": len(sources),
+                    "detected_language": detected_language
+                })
+
+            yield {"type": "done", "answer": answer}
+
         except Exception as e:
-            return {
-                "answer": f"Sorry, I encountered an error: {str(e)}",
-                "sources": [],
-                "num_sources": 0,
-                "detected_language": "en"
+            yield {"type": "error", "answer": f"Sorry, I encountered an error: {str(e)}"}
+
+    def get_cache_scope(self, language, search_type, top_k, metadata_filter=None):
+        """Cached answers are only reused for requests with the same retrieval settings"""
+        return (language, search_type, top_k, metadata_filter.key() if metadata_filter else None)
+
+    def route_to_tables(self, question, language, metadata_filter=None):
+        """Answer from the event tables when the router recognises a lookup; None means full RAG"""
+        response = None
+        # Explicit retrieval filters ask for the RAG path
+        if self.table_router is not None and metadata_filter is None:
+            with span("table_routing"):
+                response = self.table_router.route(question, language)
+        count_query_route("table" if response is not None else "rag")
+        return response
+
+    def lookup_cached_answer(self, search_question, scope):
+        """Return (query_embedding, cached_response); both are None when the cache is disabled"""
+        if self.semantic_cache is None:
+            return None, None
+
+        self.refresh_cache_fingerprint()
+        with span("query_embedding"):
+            query_embedding = self.embeddings.embed_query(search_question)
+        with span("semantic_cache"):
+            cached_response = self.semantic_cache.lookup(query_embedding, scope)
+        count_cache_event("semantic", "hit" if cached_response is not None else "miss")
+        return query_embedding, cached_response
+
+    def refresh_cache_fingerprint(self):
+        """Periodically compare the collection fingerprint so cached answers never outlive the data"""
+        now = time.time()
+        if now - self._fingerprint_checked_at > ChatbotConfig.SEMANTIC_CACHE_FINGERPRINT_INTERVAL:
+            self._fingerprint_checked_at = now
+            self.semantic_cache.check_fingerprint(self.get_collection_fingerprint())
+
+    def get_collection_fingerprint(self):
+        """Identify the current collection contents by document count and last on-disk write"""
+        sqlite_path = os.path.join(self.persist_directory, "chroma.sqlite3")
+        modified = os.path.getmtime(sqlite_path) if os.path.exists(sqlite_path) else 0
+        return (self.get_collection_count(), modified)
+
+    def query_batch(self, items, max_concurrency=None):
+        """
+        Answer many questions at once: one batched embedding pass, one batched vector search
+        and concurrent LLM calls. Results keep the input order and carry per-item timings.
+        """
+        batch_start = time.perf_counter()
+
+        prepared = []
+        for item in items:
+            if item.get("auto_detect", True):
+                language = detect_language(item["question"])
+            else:
+                language = item.get("preferred_language", ChatbotConfig.DEFAULT_LANGUAGE)
+            top_k = item.get("top_k", ChatbotConfig.DEFAULT_TOP_K)
+            search_type = item.get("search_type") or ChatbotConfig.DEFAULT_SEARCH_TYPE
+            metadata_filter = MetadataFilter.from_dict(item.get("filters"))
+            prepared.append({
+                "language": language,
+                "top_k": top_k,
+                "search_type": search_type,
+                "metadata_filter": metadata_filter,
+                "search_question": f"query: {item['question']}",
+                "scope": self.get_cache_scope(language, search_type, top_k, metadata_filter),
+                "routed": self.route_to_tables(item["question"], language, metadata_filter)
+            })
+
+        results = [None] * len(items)
+        for i, item in enumerate(prepared):
+            if item["routed"] is not None:
+                results[i] = dict(item["routed"], timing={"embedding": 0.0, "retrieval": 0.0, "llm": 0.0})
+                results[i]["response_time"] = round(time.perf_counter() - batch_start, 2)
+        remaining = [i for i in range(len(prepared)) if results[i] is None]
+
+        stage_start = time.perf_counter()
+        embedded = self.embeddings.embed_queries([prepared[i]["search_question"] for i in remaining]) if remaining else []
+        query_embeddings = dict(zip(remaining, embedded))
+        embedding_time = time.perf_counter() - stage_start
+
+        pending = []
+        if self.semantic_cache is not None:
+            self.refresh_cache_fingerprint()
+        for i in remaining:
+            item = prepared[i]
+            cached = None
+            if self.semantic_cache is not None:
+                cached = self.semantic_cache.lookup(query_embeddings[i], item["scope"])
+                count_cache_event("semantic", "hit" if cached is not None else "miss")
+            if cached is not None:
+                cached["timing"] = {"embedding": round(embedding_time, 4), "retrieval": 0.0, "llm": 0.0}
+                cached["response_time"] = round(time.perf_counter() - batch_start, 2)
+                results[i] = cached
+            else:
+                pending.append(i)
+
+        # Plain unfiltered similarity searches run together; the rest go through their retriever
+        stage_start = time.perf_counter()
+        dense = [
+            i for i in pending
+            if prepared[i]["search_type"] == "similarity" and prepared[i]["metadata_filter"] is None
+        ]
+        candidate_ks = [
+            self.get_rerank_candidates(prepared[i]["top_k"]) if self.reranker else prepared[i]["top_k"]
+            for i in dense
+        ]
+        retrieved = dict(zip(dense, self.retrieve_by_vectors([query_embeddings[i] for i in dense], candidate_ks)))
+        for i in dense:
+            if self.reranker is not None:
+                retrieved[i] = self.reranker.rerank(prepared[i]["search_question"], retrieved[i], prepared[i]["top_k"])
+            if self.context_builder is not None:
+                retrieved[i] = self.context_builder.pack(prepared[i]["search_question"], retrieved[i])
+        for i in pending:
+            if i not in retrieved:
+                item = prepared[i]
+                retriever = self.get_request_retriever(item["search_type"], item["top_k"], item["metadata_filter"])
+                retrieved[i] = retriever.get_relevant_documents(item["search_question"])
+        retrieval_time = time.perf_counter() - stage_start
+
+        def answer(i, docs):
+            item = prepared[i]
+            llm_start = time.perf_counter()
+            try:
+                result = self.llm.invoke(self.build_prompt(item["language"], docs, item["search_question"]))
+                sources = self.format_sources(docs)
+                response = {
+                    "answer": result.content if hasattr(result, 'content') else str(result),
+                    "sources": sources,
+                    "num_sources": len(sources),
+                    "detected_language": item["language"]
+                }
+                if self.semantic_cache is not None:
+                    self.semantic_cache.store(query_embeddings[i], item["scope"], response)
+            except Exception as e:
+                response = {
+                    "answer": f"Sorry, I encountered an error: {str(e)}",
+                    "sources": [],
+                    "num_sources": 0,
+                    "detected_language": item["language"]
+                }
+            response["timing"] = {
+                "embedding": round(embedding_time, 4),
+                "retrieval": round(retrieval_time, 4),
+                "llm": round(time.perf_counter() - llm_start, 4)
+            }
+            response["response_time"] = round(time.perf_counter() - batch_start, 2)
+            return response
+
+        if pending:
+            workers = max(1, min(max_concurrency or ChatbotConfig.BATCH_MAX_CONCURRENCY, len(pending)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chatbot-batch") as executor:
+                futures = [(i, executor.submit(answer, i, retrieved[i])) for i in pending]
+                for i, future in futures:
+                    results[i] = future.result()
+
+        return results
+
+    def retrieve_by_vectors(self, query_embeddings, top_ks):
+        """Run several similarity searches in a single vector store call"""
+        if not query_embeddings:
+            return []
+
+        if self.vector_index is not None:
+            hits_per_query = self.vector_index.search_batch(query_embeddings, max(top_ks))
+            return [self.vector_index.get_documents(hits[:top_k]) for hits, top_k in zip(hits_per_query, top_ks)]
+
+        result = self.vectorstore._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=max(top_ks),
+            include=["documents", "metadatas"]
+        )
+        retrieved = []
+        for documents, metadatas, top_k in zip(result["documents"], result["metadatas"], top_ks):
+            docs = [Document(page_content=text, metadata=metadata or {}) for text, metadata in zip(documents, metadatas)]
+            retrieved.append(docs[:top_k])
+        return retrieved
+
+    def build_prompt(self, language, docs, search_question):
+        """Format the language prompt with the context laid out as LangChain's "stuff" chain does"""
+        context = "\n\n".join(doc.page_content for doc in docs)
+        prompt = self.get_prompt(language).format(context=context, question=search_question)
+        observe_prompt_tokens(estimate_tokens(prompt, ChatbotConfig.CONTEXT_CHARS_PER_TOKEN), language)
+        return prompt
+
+    def format_sources(self, documents):
+        """Convert retrieved documents into the source dicts returned to clients"""
+        sources = []
+        for doc in documents:
+            source_info = {
+                "title": doc.metadata.get("title", "Unknown"),
+                "url": doc.metadata.get("url", ""),
+                "contains_table": doc.metadata.get("contains_table", False),
+                "chunk_length": doc.metadata.get("chunk_length", 0),
+                "content_preview": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
             }
+            sources.append(source_info)
+        return sources
     
     def get_collection_count(self):
         try:
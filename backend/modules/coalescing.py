@@ -0,0 +1,57 @@
+import asyncio
+import re
+import unicodedata
+
+from .tracing import count_coalesced_request
+
+
+def normalize_question(question):
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a question"""
+    question = unicodedata.normalize("NFC", question).lower()
+    return re.sub(r"\s+", " ", question).strip(" ?!.")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests on the event loop: the first caller for a key
+    starts the computation, callers arriving while it is in flight await the same result
+    (or exception). Nothing is kept once it completes, so this is not a cache.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key, compute):
+        """Return the result of compute() (a coroutine function), shared with identical in-flight calls"""
+        # Only touched from the event loop thread, so no lock is needed
+        task = self._in_flight.get(key)
+        if task is None:
+            # A separate task, so a disconnecting first caller does not cancel it for the others
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+            self.leaders += 1
+            count_coalesced_request(self.name, "leader")
+        else:
+            self.coalesced += 1
+            count_coalesced_request(self.name, "follower")
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self):
+        total = self.leaders + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "computations": self.leaders,
+            "coalesced_requests": self.coalesced,
+            "coalesced_rate": round(self.coalesced / total, 3) if total else 0.0
+        }
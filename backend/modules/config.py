@@ -15,13 +15,103 @@ class ChatbotConfig:
     
     # Model Configuration
     EMBEDDING_MODEL = "intfloat/multilingual-e5-large"
+    # "sentence-transformers" (PyTorch fp32) or "onnx" (ONNX Runtime, dynamic int8 quantization)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "sentence-transformers")
+    ONNX_MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "onnx_e5_int8")
+    ONNX_INTRA_OP_THREADS = int(os.getenv("ONNX_INTRA_OP_THREADS", "0"))
     LLM_MODEL = "gemini-2.0-flash"
     LLM_TEMPERATURE = 0.1
     
     # Vector Database Configuration
     VECTOR_DB_PATH = os.path.join(os.path.dirname(__file__), "..", "chroma_db_langchain_e5")
     DEFAULT_TOP_K = 5
+    
+    # Ingestion Configuration
+    SCRAPED_DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data", "processed", "json_original", "apec2025_scraped_data.json")
+    INGEST_MANIFEST_PATH = os.path.join(os.path.dirname(__file__), "..", "ingest_manifest.json")
+    BULK_INGEST_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "bulk_ingest")
+    BULK_INGEST_BATCH_SIZE = 64
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+    
+    # Retriever backend: "chroma" (HNSW on disk), "numpy" (exact search over a memory-mapped matrix),
+    # or "int8"/"binary" (quantized codes in memory, top candidates rescored from the memory-mapped matrix)
+    RETRIEVER_BACKEND = os.getenv("RETRIEVER_BACKEND", "chroma")
+    NUMPY_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "numpy_index_e5")
+    NUMPY_INDEX_DTYPE = "float32"
+    # Candidates rescored with float vectors, as a multiple of k; sign bits need a wider first pass
+    INT8_RESCORE_MULTIPLIER = 4
+    BINARY_RESCORE_MULTIPLIER = 16
+    
+    # Hybrid (BM25 + dense) search Configuration
+    LEXICAL_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", "lexical_index")
+    HYBRID_CANDIDATE_MULTIPLIER = 4
+    RRF_K = 60
     DEFAULT_SEARCH_TYPE = "similarity"
+    SUPPORTED_SEARCH_TYPES = ["similarity", "mmr", "hybrid"]
+    MAX_CACHED_RETRIEVERS = 32
+    
+    # Startup: load the embedding model, reranker, LLM client and vector store concurrently
+    PARALLEL_STARTUP = os.getenv("PARALLEL_STARTUP", "true").lower() == "true"
+    
+    # Cross-encoder Reranking Configuration (retrieve RERANK_CANDIDATES, keep top_k)
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
+    RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+    RERANK_BATCH_SIZE = 16
+    RERANK_CACHE_SIZE = 4096
+    
+    # Tracing / Metrics Configuration (per-stage spans exported on /metrics)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    
+    # Context Packing Configuration (token budget for the chunks stuffed into the prompt)
+    CONTEXT_PACKING_ENABLED = os.getenv("CONTEXT_PACKING_ENABLED", "true").lower() == "true"
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))
+    CONTEXT_TABLE_MAX_ROWS = 12
+    CONTEXT_CHARS_PER_TOKEN = 4
+    
+    # Table Routing Configuration (schedule/venue lookups answered from parsed tables, without the LLM).
+    # Off until its precision has been measured on a labeled question set (benchmarks/bench_table_routing.py)
+    TABLE_ROUTING_ENABLED = os.getenv("TABLE_ROUTING_ENABLED", "false").lower() == "true"
+    TABLE_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", "table_store.sqlite3")
+    TABLE_ROUTING_MAX_ROWS = 30
+    
+    # Semantic Answer Cache Configuration (off until benchmarks/bench_semantic_cache_threshold.py passes
+    # for the configured threshold: near-miss questions such as SOM2/SOM3 must not share an answer)
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = 0.95
+    SEMANTIC_CACHE_MAX_ENTRIES = 1000
+    SEMANTIC_CACHE_TTL = 3600
+    SEMANTIC_CACHE_MAX_MB = 64
+    SEMANTIC_CACHE_FINGERPRINT_INTERVAL = 5
+    
+    # Query Embedding Micro-Batching Configuration
+    EMBEDDING_BATCHING_ENABLED = os.getenv("EMBEDDING_BATCHING_ENABLED", "true").lower() == "true"
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5"))
+    
+    # Query Embedding Cache Configuration
+    QUERY_EMBEDDING_CACHE_SIZE = 2048
+    QUERY_EMBEDDING_CACHE_DIR = os.getenv("QUERY_EMBEDDING_CACHE_DIR")
+    QUERY_EMBEDDING_CACHE_DISK_CAPACITY = 100000
+    
+    # API Worker Pool Configuration
+    API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", "4"))
+    API_MAX_QUEUE = int(os.getenv("API_MAX_QUEUE", "16"))
+    API_QUEUE_TIMEOUT = float(os.getenv("API_QUEUE_TIMEOUT", "30"))
+    
+    # Request Coalescing Configuration (identical in-flight /chat requests share one computation)
+    REQUEST_COALESCING_ENABLED = os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() == "true"
+    
+    # Batch Chat Configuration
+    BATCH_MAX_ITEMS = 256
+    BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    
+    # Follow-up Suggestion Configuration
+    SUGGESTION_WORKERS = 2
+    SUGGESTION_CACHE_SIZE = 256
+    SUGGESTION_RETRY_SECONDS = 60
+    SUGGESTION_WAIT_SECONDS = float(os.getenv("SUGGESTION_WAIT_SECONDS", "0"))
+    SUGGESTION_STREAM_TIMEOUT = 10
     
     # UI Configuration
     APP_TITLE = "APEC 2025 Korea Chatbot"
@@ -33,6 +123,7 @@ class ChatbotConfig:
     SUPPORTED_LANGUAGES = ["vi", "en"]
     DEFAULT_LANGUAGE = "vi"
     AUTO_DETECT_DEFAULT = True
+    LANGDETECT_FALLBACK = True
     
     # Chat Configuration
     MAX_CHAT_HISTORY = 100
@@ -0,0 +1,168 @@
+import math
+import re
+import threading
+from typing import Any, List
+
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain.schema import BaseRetriever, Document
+
+from .lexical import TASK_PREFIXES, tokenize
+from .tracing import span
+
+
+TABLE_ROW_PATTERN = re.compile(r"^Row \d+:")
+
+
+def estimate_tokens(text, chars_per_token=4):
+    """Cheap token estimate; Gemini averages roughly four characters per token"""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+def strip_passage_prefix(text):
+    for prefix in TASK_PREFIXES:
+        if text.startswith(prefix):
+            return prefix, text[len(prefix):]
+    return "", text
+
+
+def overlap_length(left, right, max_chars):
+    """Length of the longest suffix of left that is also a prefix of right (chunker overlap)"""
+    tail = left[-max_chars:]
+    for start in range(len(tail)):
+        if right.startswith(tail[start:]):
+            return len(tail) - start
+    return 0
+
+
+def trim_table_rows(text, query, max_rows):
+    """Keep the non-row lines of a table chunk plus the max_rows rows that best match the query"""
+    lines = text.split("\n")
+    row_positions = [i for i, line in enumerate(lines) if TABLE_ROW_PATTERN.match(line)]
+    if len(row_positions) <= max_rows:
+        return text
+
+    # Rarer query terms count more, so "SOM2" outweighs "meeting" which is in every row
+    query_terms = set(tokenize(query))
+    row_terms = [set(tokenize(lines[i])) & query_terms for i in row_positions]
+    doc_freq = {}
+    for terms in row_terms:
+        for term in terms:
+            doc_freq[term] = doc_freq.get(term, 0) + 1
+    scores = [
+        sum(math.log(1 + len(row_positions) / doc_freq[term]) for term in terms)
+        for terms in row_terms
+    ]
+
+    ranked = sorted(range(len(row_positions)), key=lambda i: scores[i], reverse=True)
+    keep = {row_positions[i] for i in ranked[:max_rows] if scores[i] > 0}
+    if not keep:
+        keep = set(row_positions[:max_rows])
+
+    rows = set(row_positions)
+    trimmed = [line for i, line in enumerate(lines) if i not in rows or i in keep]
+    trimmed.append(f"({len(row_positions) - len(keep)} other rows omitted)")
+    return "\n".join(trimmed)
+
+
+class ContextBuilder:
+    """
+    Packs retrieved chunks into a per-request token budget: chunks are taken in score order,
+    exact duplicates and the overlap between neighbouring chunks of a page are removed,
+    and long tables are cut down to the rows that match the question.
+    """
+
+    def __init__(self, max_tokens=2000, table_max_rows=12, overlap_chars=200, chars_per_token=4):
+        self.max_tokens = max_tokens
+        self.table_max_rows = table_max_rows
+        self.overlap_chars = overlap_chars
+        self.chars_per_token = chars_per_token
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.raw_tokens = 0
+        self.packed_tokens = 0
+
+    def pack(self, query, documents):
+        """Return the documents to put in the prompt, in score order and within the token budget"""
+        with span("context_packing"):
+            return self._pack(query, documents)
+
+    def _pack(self, query, documents):
+        if documents and all("rerank_score" in doc.metadata for doc in documents):
+            documents = sorted(documents, key=lambda doc: doc.metadata["rerank_score"], reverse=True)
+
+        packed = []
+        seen_texts = set()
+        used_tokens = 0
+        for doc in documents:
+            prefix, text = strip_passage_prefix(doc.page_content)
+            if text in seen_texts:
+                continue
+            seen_texts.add(text)
+
+            text = self._remove_overlap(doc, text, packed)
+            if doc.metadata.get("contains_table"):
+                text = trim_table_rows(text, query, self.table_max_rows)
+
+            tokens = estimate_tokens(text, self.chars_per_token)
+            remaining = self.max_tokens - used_tokens
+            if tokens > remaining:
+                # Cut the last chunk at a line boundary rather than dropping it, if enough room is left
+                if remaining < 50:
+                    break
+                text = text[:remaining * self.chars_per_token].rsplit("\n", 1)[0]
+                tokens = estimate_tokens(text, self.chars_per_token)
+
+            packed.append(Document(page_content=prefix + text, metadata=doc.metadata))
+            used_tokens += tokens
+            if used_tokens >= self.max_tokens:
+                break
+
+        self._record(query, documents, packed, used_tokens)
+        return packed
+
+    def stats(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "avg_raw_context_tokens": round(self.raw_tokens / self.requests, 1) if self.requests else 0.0,
+                "avg_packed_context_tokens": round(self.packed_tokens / self.requests, 1) if self.requests else 0.0,
+                "saved_ratio": round(1 - self.packed_tokens / self.raw_tokens, 3) if self.raw_tokens else 0.0
+            }
+
+    def _remove_overlap(self, doc, text, packed):
+        """Drop text already present at the edge of a neighbouring chunk of the same page"""
+        url = doc.metadata.get("url")
+        index = doc.metadata.get("chunk_index")
+        if url is None or index is None:
+            return text
+
+        for other in packed:
+            if other.metadata.get("url") != url:
+                continue
+            other_text = strip_passage_prefix(other.page_content)[1]
+            if other.metadata.get("chunk_index") == index - 1:
+                text = text[overlap_length(other_text, text, self.overlap_chars):]
+            elif other.metadata.get("chunk_index") == index + 1:
+                cut = overlap_length(text, other_text, self.overlap_chars)
+                text = text[:len(text) - cut]
+        return text
+
+    def _record(self, query, documents, packed, packed_tokens):
+        raw_tokens = sum(estimate_tokens(strip_passage_prefix(doc.page_content)[1], self.chars_per_token) for doc in documents)
+        with self._lock:
+            self.requests += 1
+            self.raw_tokens += raw_tokens
+            self.packed_tokens += packed_tokens
+
+
+class PackedContextRetriever(BaseRetriever):
+    """Runs another retriever and packs its results with a ContextBuilder"""
+
+    base_retriever: Any
+    context_builder: Any
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self.context_builder.pack(query, self.base_retriever.get_relevant_documents(query))
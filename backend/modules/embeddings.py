@@ -0,0 +1,116 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from langchain.schema.embeddings import Embeddings
+
+
+# Process-wide registry so every APECChatbot in the process shares the same weights
+_model_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_model(model_name, backend="sentence-transformers"):
+    """
+    Return the shared encoder for model_name, loading it on first use. backend "onnx" serves
+    an int8-quantized ONNX Runtime export instead of the PyTorch SentenceTransformer.
+    """
+    key = (backend, model_name)
+    model = _model_registry.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        model = _model_registry.get(key)
+        if model is None:
+            if backend == "onnx":
+                from .config import ChatbotConfig
+                from .onnx_embeddings import OnnxEmbeddingModel
+                model = OnnxEmbeddingModel.load_or_export(
+                    model_name,
+                    ChatbotConfig.ONNX_MODEL_DIR,
+                    intra_op_threads=ChatbotConfig.ONNX_INTRA_OP_THREADS
+                )
+            elif backend == "sentence-transformers":
+                # Imported here so processes that never encode (or have not warmed up yet) skip torch
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(model_name)
+            else:
+                raise Exception(f"Unknown embedding backend '{backend}'")
+            _model_registry[key] = model
+    return model
+
+
+def clear_embedding_models():
+    """Drop all shared models (mainly useful for tests and benchmarks)"""
+    with _registry_lock:
+        _model_registry.clear()
+
+
+class E5Embeddings(Embeddings):
+    """
+    LangChain embeddings adapter around a SentenceTransformer (or ONNX) encoder. The model may be
+    passed as a Future still loading in the background; the first embed_* call blocks until it
+    resolves, so construction itself never waits.
+    """
+
+    def __init__(self, model, query_cache=None, batcher=None):
+        self._model = model
+        self.query_cache = query_cache
+        # Optional MicroBatcher that merges concurrent single-query encodes into one forward pass
+        self.batcher = batcher
+
+    @property
+    def model(self):
+        if isinstance(self._model, Future):
+            self._model = self._model.result()
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        self._model = model
+
+    def embed_documents(self, texts):
+        # Same preprocessing as SentenceTransformerEmbeddings so stored vectors stay comparable
+        texts = [text.replace("\n", " ") for text in texts]
+        embeddings = self.model.encode(texts, normalize_embeddings=True)
+        return embeddings.tolist()
+
+    def embed_query(self, text):
+        if self.query_cache is None:
+            return self._encode_query(text)
+
+        cached = self.query_cache.get(text)
+        if cached is not None:
+            return cached.tolist()
+
+        start_time = time.perf_counter()
+        embedding = self._encode_query(text)
+        self.query_cache.put(text, embedding, time.perf_counter() - start_time)
+        return embedding
+
+    def _encode_query(self, text):
+        if self.batcher is not None:
+            return self.batcher.submit(text)
+        return self.embed_documents([text])[0]
+
+    def embed_queries(self, texts):
+        """Embed several queries, encoding all cache misses in a single batched forward pass"""
+        embeddings = [None] * len(texts)
+        missing = []
+        for i, text in enumerate(texts):
+            cached = self.query_cache.get(text) if self.query_cache is not None else None
+            if cached is not None:
+                embeddings[i] = cached.tolist()
+            else:
+                missing.append(i)
+
+        if missing:
+            start_time = time.perf_counter()
+            encoded = self.embed_documents([texts[i] for i in missing])
+            per_item_seconds = (time.perf_counter() - start_time) / len(missing)
+            for i, embedding in zip(missing, encoded):
+                embeddings[i] = embedding
+                if self.query_cache is not None:
+                    self.query_cache.put(texts[i], embedding, per_item_seconds)
+        return embeddings
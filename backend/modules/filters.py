@@ -0,0 +1,134 @@
+import bisect
+
+import numpy as np
+
+
+class MetadataFilter:
+    """
+    Chunk metadata constraints for a query. Page constraints (titles, exact URLs, URL prefixes)
+    are alternatives; the table constraint must hold in addition to them.
+    """
+
+    FIELDS = ("contains_table", "titles", "urls", "url_prefixes")
+
+    def __init__(self, contains_table=None, titles=None, urls=None, url_prefixes=None):
+        self.contains_table = contains_table
+        self.titles = tuple(sorted(set(titles or ())))
+        self.urls = tuple(sorted(set(urls or ())))
+        self.url_prefixes = tuple(sorted(set(url_prefixes or ())))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a filter from request data; returns None when nothing is constrained"""
+        if data is None or isinstance(data, cls):
+            return data if data is None or not data.is_empty() else None
+        unknown = set(data) - set(cls.FIELDS)
+        if unknown:
+            raise Exception(f"Unknown filter fields {sorted(unknown)}, expected {cls.FIELDS}")
+        metadata_filter = cls(**data)
+        return None if metadata_filter.is_empty() else metadata_filter
+
+    def is_empty(self):
+        return self.contains_table is None and not self.has_page_constraint()
+
+    def has_page_constraint(self):
+        return bool(self.titles or self.urls or self.url_prefixes)
+
+    def key(self):
+        """Hashable identity, used in chain and cache keys"""
+        return (self.contains_table, self.titles, self.urls, self.url_prefixes)
+
+    def matches(self, metadata):
+        if self.contains_table is not None and bool(metadata.get("contains_table", False)) != self.contains_table:
+            return False
+        if not self.has_page_constraint():
+            return True
+        url = metadata.get("url", "")
+        return (
+            metadata.get("title") in self.titles
+            or url in self.urls
+            or any(url.startswith(prefix) for prefix in self.url_prefixes)
+        )
+
+
+class MetadataIndex:
+    """
+    Posting lists (sorted row ids) per table flag, title and URL over the chunk metadata,
+    so a filter resolves to its candidate rows before any similarity scoring
+    """
+
+    def __init__(self, metadatas):
+        self.size = len(metadatas)
+        table_rows, title_rows, url_rows = {True: [], False: []}, {}, {}
+        for row, metadata in enumerate(metadatas):
+            metadata = metadata or {}
+            table_rows[bool(metadata.get("contains_table", False))].append(row)
+            title_rows.setdefault(metadata.get("title", ""), []).append(row)
+            url_rows.setdefault(metadata.get("url", ""), []).append(row)
+
+        self.table_postings = {flag: np.asarray(rows, dtype=np.int64) for flag, rows in table_rows.items()}
+        self.title_postings = {title: np.asarray(rows, dtype=np.int64) for title, rows in title_rows.items()}
+        self.url_postings = {url: np.asarray(rows, dtype=np.int64) for url, rows in url_rows.items()}
+        # Sorted URLs turn a prefix into a contiguous range found with two binary searches
+        self.sorted_urls = sorted(self.url_postings)
+
+    @classmethod
+    def from_documents(cls, documents):
+        return cls([doc.metadata for doc in documents])
+
+    def __len__(self):
+        return self.size
+
+    def urls_with_prefix(self, prefix):
+        start = bisect.bisect_left(self.sorted_urls, prefix)
+        end = bisect.bisect_left(self.sorted_urls, prefix + "\U0010ffff")
+        return self.sorted_urls[start:end]
+
+    def page_urls(self, metadata_filter):
+        """Exact URLs plus every indexed URL under the filter's prefixes"""
+        urls = set(url for url in metadata_filter.urls if url in self.url_postings)
+        for prefix in metadata_filter.url_prefixes:
+            urls.update(self.urls_with_prefix(prefix))
+        return sorted(urls)
+
+    def rows(self, metadata_filter):
+        """Sorted row ids matching the filter, or None when it does not constrain anything"""
+        if metadata_filter is None or metadata_filter.is_empty():
+            return None
+
+        rows = None
+        if metadata_filter.has_page_constraint():
+            postings = [self.title_postings[t] for t in metadata_filter.titles if t in self.title_postings]
+            postings += [self.url_postings[url] for url in self.page_urls(metadata_filter)]
+            rows = np.unique(np.concatenate(postings)) if postings else np.zeros(0, dtype=np.int64)
+        if metadata_filter.contains_table is not None:
+            table_rows = self.table_postings[metadata_filter.contains_table]
+            rows = table_rows if rows is None else np.intersect1d(rows, table_rows, assume_unique=True)
+        return rows
+
+    def chroma_where(self, metadata_filter):
+        """
+        Equivalent Chroma `where` clause (Chroma applies it before the HNSW search).
+        URL prefixes are expanded to the matching URLs, since Chroma has no prefix operator.
+        """
+        clauses = []
+        if metadata_filter.contains_table is not None:
+            clauses.append({"contains_table": metadata_filter.contains_table})
+        if metadata_filter.has_page_constraint():
+            pages = []
+            if metadata_filter.titles:
+                pages.append({"title": {"$in": list(metadata_filter.titles)}})
+            urls = self.page_urls(metadata_filter)
+            if urls:
+                pages.append({"url": {"$in": urls}})
+            clauses.append(pages[0] if len(pages) == 1 else {"$or": pages})
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def facets(self):
+        """Values clients can filter on, with their chunk counts"""
+        return {
+            "total": self.size,
+            "contains_table": {str(flag).lower(): len(rows) for flag, rows in self.table_postings.items()},
+            "titles": {title: len(rows) for title, rows in sorted(self.title_postings.items()) if title},
+            "urls": {url: len(rows) for url, rows in sorted(self.url_postings.items()) if url}
+        }
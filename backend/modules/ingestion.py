@@ -0,0 +1,465 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+
+# Same settings the RAG_Prep notebook used to build the collection
+CHUNK_SIZE = 1200
+CHUNK_OVERLAP = 200
+MIN_CHUNK_SIZE = 200
+
+
+def process_table_content(table_content):
+    """Process table content to make it more readable for embeddings"""
+    lines = table_content.strip().split('\n')
+    processed_lines = []
+
+    # Add table header
+    processed_lines.append('\n\nTABLE:')
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        # Process headers
+        if line.startswith('HEADERS:'):
+            header_content = line.replace('HEADERS:', '').strip()
+            if '|' in header_content:
+                headers = [h.strip() for h in header_content.split('|')]
+                processed_lines.append(f"Columns: {' | '.join(headers)}")
+            else:
+                processed_lines.append(f"Columns: {header_content}")
+
+        # Process rows
+        elif line.startswith('ROW '):
+            row_match = re.match(r'ROW (\d+):\s*(.*)', line)
+            if row_match:
+                row_num, row_content = row_match.groups()
+                if '|' in row_content:
+                    row_data = [cell.strip() for cell in row_content.split('|')]
+                    processed_lines.append(f"Row {row_num}: {' | '.join(row_data)}")
+                else:
+                    processed_lines.append(f"Row {row_num}: {row_content}")
+
+        # Handle separator lines
+        elif line.startswith('--'):
+            continue
+
+        else:
+            if line and not line.startswith('ROW') and not line.startswith('HEADERS'):
+                processed_lines.append(line)
+
+    return '\n'.join(processed_lines) + '\n'
+
+
+def clean_content(content):
+    content = re.sub(r'[ \t]+', ' ', content)
+    content = re.sub(r'\n\s*\n', '\n\n', content)
+
+    # Clean section markers first
+    content = re.sub(r'=== (.*?) ===', r'\n\n## \1\n', content)
+    content = re.sub(r'--- (.*?) ---', r'\n\n### \1\n', content)
+
+    if '[TABLE START]' in content and '[TABLE END]' in content:
+        tables = re.findall(r'\[TABLE START\](.*?)\[TABLE END\]', content, re.DOTALL)
+        for table_content in tables:
+            processed_table = process_table_content(table_content)
+            content = content.replace(f'[TABLE START]{table_content}[TABLE END]', processed_table)
+
+    return content.strip()
+
+
+def page_to_document(item):
+    """Turn one scraped page into a cleaned Document, as in the RAG_Prep notebook"""
+    return Document(
+        page_content=clean_content(item.get('content', '')),
+        metadata={
+            'source': 'json',
+            'url': item.get('url', ''),
+            'title': item.get('title', ''),
+            'word_count': item.get('word_count', 0),
+            'link_text': item.get('link_text', '')
+        }
+    )
+
+
+def chunk_document(doc, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, min_chunk_size=MIN_CHUNK_SIZE):
+    """Chunk one cleaned page; tables stay whole and short chunks are merged with their neighbours"""
+    content = doc.page_content
+
+    # If content has a table, keep as one piece
+    if 'TABLE:' in content:
+        metadata = dict(doc.metadata)
+        metadata.update({
+            'chunk_id': f"{doc.metadata.get('title', 'unknown')}_0",
+            'chunk_index': 0,
+            'total_chunks': 1,
+            'original_doc_length': len(content),
+            'chunk_length': len(content),
+            'contains_table': True
+        })
+        return [Document(page_content=content, metadata=metadata)]
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", ". ", "! ", "? ", "; ", ", ", " ", ""]
+    )
+    chunks = text_splitter.split_documents([doc])
+
+    merged_chunks = []
+    i = 0
+    while i < len(chunks):
+        current_content = chunks[i].page_content.strip()
+
+        # If current chunk is short, collect all consecutive short chunks
+        if len(current_content) < min_chunk_size:
+            buffer_parts = [current_content]
+            j = i + 1
+            while j < len(chunks) and len(chunks[j].page_content.strip()) < min_chunk_size:
+                buffer_parts.append(chunks[j].page_content.strip())
+                j += 1
+
+            # Merge buffer with next long chunk
+            if j < len(chunks):
+                final_content = "\n\n".join(buffer_parts) + "\n\n" + chunks[j].page_content.strip()
+                if len(final_content) <= chunk_size * 1.2:
+                    merged_chunks.append(Document(page_content=final_content, metadata=chunks[i].metadata.copy()))
+                    i = j + 1
+                    continue
+
+            # If no long chunk or merge too big, create chunk from buffer only
+            merged_chunks.append(Document(page_content="\n\n".join(buffer_parts), metadata=chunks[i].metadata.copy()))
+            i = j
+        else:
+            merged_chunks.append(chunks[i])
+            i += 1
+
+    for idx, chunk in enumerate(merged_chunks):
+        chunk.metadata.update({
+            'chunk_id': f"{doc.metadata.get('title', 'unknown')}_{idx}",
+            'chunk_index': idx,
+            'total_chunks': len(merged_chunks),
+            'original_doc_length': len(content),
+            'chunk_length': len(chunk.page_content),
+            'contains_table': False
+        })
+    return merged_chunks
+
+
+def load_scraped_pages(path):
+    """Load successfully scraped pages from apec2025_scraped_data.json"""
+    with open(path, encoding='utf-8') as f:
+        pages = json.load(f)
+    return [page for page in pages if page.get('status', 'success') == 'success' and page.get('url')]
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def page_hash(item):
+    """Hash of everything about a page that affects its chunks"""
+    return content_hash(json.dumps(
+        [item.get('url', ''), item.get('title', ''), item.get('content', ''), item.get('link_text', ''), str(item.get('word_count', 0))],
+        ensure_ascii=False
+    ))
+
+
+def chunk_vector_id(url, chunk_index):
+    """Stable vector store id for a chunk of a page"""
+    return f"{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}_{chunk_index}"
+
+
+class IncrementalIndexer:
+    """
+    Keeps a Chroma collection in sync with the scraped pages: unchanged pages are skipped,
+    only new or changed chunks are embedded, and chunks that disappeared are deleted.
+    """
+
+    def __init__(self, collection, embeddings, manifest_path, batch_size=100):
+        self.collection = collection
+        self.embeddings = embeddings
+        self.manifest_path = manifest_path
+        self.batch_size = batch_size
+        self.manifest = self._load_manifest()
+
+    def sync(self, pages, dry_run=False, delete_unmanaged=False):
+        """
+        Bring the collection in line with pages and return a summary of what changed. Chunks this
+        pipeline did not create (e.g. the notebook-built store) are only removed with delete_unmanaged.
+        """
+        start_time = time.time()
+        stats = {
+            "pages": len(pages),
+            "pages_unchanged": 0,
+            "pages_changed": 0,
+            "pages_removed": 0,
+            "chunks_embedded": 0,
+            "chunks_reused": 0,
+            "chunks_deleted": 0
+        }
+        new_manifest = {}
+        to_upsert = []
+        stale_ids = set()
+
+        for item in pages:
+            url = item['url']
+            digest = page_hash(item)
+            previous = self.manifest.get(url)
+            if previous and previous["page_hash"] == digest:
+                new_manifest[url] = previous
+                stats["pages_unchanged"] += 1
+                continue
+
+            stats["pages_changed"] += 1
+            previous_chunks = previous["chunks"] if previous else {}
+            chunks = {}
+            for chunk in chunk_document(page_to_document(item)):
+                chunk_id = chunk_vector_id(url, chunk.metadata['chunk_index'])
+                chunk_digest = content_hash(chunk.page_content)
+                chunks[chunk_id] = chunk_digest
+                if previous_chunks.get(chunk_id) == chunk_digest:
+                    stats["chunks_reused"] += 1
+                else:
+                    to_upsert.append((chunk_id, chunk, digest))
+            stale_ids.update(set(previous_chunks) - set(chunks))
+            new_manifest[url] = {"page_hash": digest, "chunks": chunks}
+
+        for url in set(self.manifest) - set(new_manifest):
+            stats["pages_removed"] += 1
+            stale_ids.update(self.manifest[url]["chunks"])
+
+        if delete_unmanaged:
+            # Chunks not produced by this pipeline (e.g. the notebook-built store) are replaced
+            managed_ids = {chunk_id for entry in new_manifest.values() for chunk_id in entry["chunks"]}
+            existing_ids = set(self.collection.get(include=[])["ids"])
+            stale_ids.update(existing_ids - managed_ids)
+
+        stats["chunks_embedded"] = len(to_upsert)
+        stats["chunks_deleted"] = len(stale_ids)
+        if dry_run:
+            stats["elapsed_seconds"] = round(time.time() - start_time, 2)
+            return stats
+
+        # Upsert before deleting, so an interrupted run never leaves the served store emptier than
+        # before; the manifest is only saved at the end, so a rerun redoes whatever did not finish
+        for i in range(0, len(to_upsert), self.batch_size):
+            batch = to_upsert[i:i + self.batch_size]
+            # Stored texts carry the e5 "passage: " prefix, like the original store
+            texts = [f"passage: {chunk.page_content}" for _, chunk, _ in batch]
+            metadatas = [dict(chunk.metadata, page_hash=digest) for _, chunk, digest in batch]
+            self.collection.upsert(
+                ids=[chunk_id for chunk_id, _, _ in batch],
+                embeddings=self.embeddings.embed_documents(texts),
+                documents=texts,
+                metadatas=metadatas
+            )
+
+        stale_ids = list(stale_ids)
+        for i in range(0, len(stale_ids), self.batch_size):
+            self.collection.delete(ids=stale_ids[i:i + self.batch_size])
+
+        self.manifest = new_manifest
+        self._save_manifest()
+        stats["elapsed_seconds"] = round(time.time() - start_time, 2)
+        return stats
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def iter_scraped_pages(path):
+    """Yield successfully scraped pages; .jsonl files are streamed line by line"""
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    page = json.loads(line)
+                    if page.get('status', 'success') == 'success' and page.get('url'):
+                        yield page
+    else:
+        yield from load_scraped_pages(path)
+
+
+def chunk_page(item):
+    """Clean and chunk one page into (vector_id, text, metadata) tuples; runs in worker processes"""
+    chunks = chunk_document(page_to_document(item))
+    return [
+        (chunk_vector_id(item['url'], chunk.metadata['chunk_index']), chunk.page_content, chunk.metadata)
+        for chunk in chunks
+    ]
+
+
+def chunk_indexed_page(indexed_page):
+    """chunk_page for a (page_index, page) pair, keeping the index with the result"""
+    page_index, page = indexed_page
+    return page_index, chunk_page(page)
+
+
+def parallel_map_ordered(fn, iterable, executor, max_pending):
+    """Like executor.map, but pulls from iterable lazily so only max_pending items are in flight"""
+    pending = deque()
+    for item in iterable:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class StreamingIngestionPipeline:
+    """
+    Generator-based bulk ingestion: pages are cleaned and chunked across a process pool,
+    embedded in fixed-size batches, and each batch is appended to a raw float32 vector file
+    (readable with np.memmap) and upserted into the vector store as soon as it is ready.
+    A checkpoint written after every batch lets an interrupted run resume where it stopped.
+    """
+
+    def __init__(self, embeddings, output_dir, collection=None, batch_size=64, workers=None):
+        self.embeddings = embeddings
+        self.output_dir = output_dir
+        self.collection = collection
+        self.batch_size = batch_size
+        self.workers = workers or os.cpu_count() or 1
+        self.vectors_path = os.path.join(output_dir, 'embeddings.f32')
+        self.ids_path = os.path.join(output_dir, 'ids.txt')
+        self.checkpoint_path = os.path.join(output_dir, 'checkpoint.json')
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self, pages, resume=True, progress_every=10):
+        """Ingest an iterable of pages and return throughput statistics"""
+        checkpoint = self._load_checkpoint() if resume else None
+        pages_done = checkpoint['pages_done'] if checkpoint else 0
+        rows = checkpoint['rows'] if checkpoint else 0
+        dim = checkpoint['dim'] if checkpoint else None
+        self._truncate(rows, dim)
+
+        stats = {'pages': 0, 'pages_skipped': pages_done, 'chunks': 0, 'batches': 0}
+        start_time = time.time()
+        buffer = []
+        flushed_in_page = {}
+
+        def pages_to_process():
+            for page_index, page in enumerate(pages):
+                if page_index >= pages_done:
+                    yield page_index, page
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            chunked = parallel_map_ordered(chunk_indexed_page, pages_to_process(), executor, self.workers * 4)
+            last_page_index = pages_done - 1
+            for page_index, chunks in chunked:
+                last_page_index = page_index
+                stats['pages'] += 1
+                buffer.extend((page_index, chunk) for chunk in chunks)
+                while len(buffer) >= self.batch_size:
+                    batch, buffer = buffer[:self.batch_size], buffer[self.batch_size:]
+                    dim = self._flush(batch, dim)
+                    rows += len(batch)
+                    stats['batches'] += 1
+                    stats['chunks'] += len(batch)
+                    for flushed_page, _ in batch:
+                        flushed_in_page[flushed_page] = flushed_in_page.get(flushed_page, 0) + 1
+                    self._checkpoint(buffer, last_page_index, rows, dim, flushed_in_page)
+                    if progress_every and stats['batches'] % progress_every == 0:
+                        print(self._format_progress(stats, start_time))
+
+            if buffer:
+                dim = self._flush(buffer, dim)
+                rows += len(buffer)
+                stats['batches'] += 1
+                stats['chunks'] += len(buffer)
+                buffer = []
+            self._save_checkpoint({'pages_done': last_page_index + 1, 'rows': rows, 'dim': dim, 'complete': True})
+
+        elapsed = max(time.time() - start_time, 1e-9)
+        stats.update({
+            'rows': rows,
+            'dim': dim,
+            'elapsed_seconds': round(elapsed, 2),
+            'docs_per_sec': round(stats['pages'] / elapsed, 2),
+            'chunks_per_sec': round(stats['chunks'] / elapsed, 2)
+        })
+        return stats
+
+    def load_vectors(self):
+        """Memory-map the vectors written so far as a (rows, dim) float32 matrix"""
+        checkpoint = self._load_checkpoint()
+        return np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(checkpoint['rows'], checkpoint['dim']))
+
+    def _flush(self, batch, dim):
+        ids = [chunk[0] for _, chunk in batch]
+        texts = [f"passage: {chunk[1]}" for _, chunk in batch]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        if dim is None:
+            dim = vectors.shape[1]
+
+        with open(self.vectors_path, 'ab') as f:
+            vectors.tofile(f)
+        with open(self.ids_path, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(ids) + '\n')
+
+        if self.collection is not None:
+            self.collection.upsert(
+                ids=ids,
+                embeddings=vectors.tolist(),
+                documents=texts,
+                metadatas=[chunk[2] for _, chunk in batch]
+            )
+        return dim
+
+    def _checkpoint(self, buffer, last_page_index, rows, dim, flushed_in_page):
+        # Pages before the first still-buffered chunk are fully written; rows of the page that is
+        # only partly written are excluded so a resume re-processes that page from its start
+        first_open_page = buffer[0][0] if buffer else last_page_index + 1
+        committed_rows = rows - flushed_in_page.get(first_open_page, 0) if buffer else rows
+        self._save_checkpoint({'pages_done': first_open_page, 'rows': committed_rows, 'dim': dim, 'complete': False})
+
+    def _truncate(self, rows, dim):
+        """Drop vectors and ids written after the last checkpoint (or everything on a fresh run)"""
+        if rows == 0 or dim is None:
+            for path in (self.vectors_path, self.ids_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return
+        with open(self.vectors_path, 'r+b') as f:
+            f.truncate(rows * dim * 4)
+        with open(self.ids_path, encoding='utf-8') as f:
+            ids = f.read().splitlines()[:rows]
+        with open(self.ids_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(ids) + '\n')
+
+    def _load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def _save_checkpoint(self, checkpoint):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _format_progress(self, stats, start_time):
+        elapsed = max(time.time() - start_time, 1e-9)
+        return (f"{stats['pages']} docs, {stats['chunks']} chunks embedded "
+                f"({stats['pages'] / elapsed:.1f} docs/sec, {stats['chunks'] / elapsed:.1f} chunks/sec)")
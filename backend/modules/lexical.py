@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Any, List
+
+import numpy as np
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain.schema import BaseRetriever, Document
+
+
+# Dates/numbers such as 2025.5.15 or 24-26 stay whole; everything else splits on non-word characters
+TOKEN_PATTERN = re.compile(r"\d+(?:[./-]\d+)+|\w+", re.UNICODE)
+TASK_PREFIXES = ("query: ", "passage: ")
+
+
+def fold_diacritics(text):
+    """Strip Vietnamese tone marks and vowel hats so "lịch họp" and "lich hop" match"""
+    text = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    return "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+
+
+def tokenize(text):
+    """
+    Vietnamese-aware tokenizer: lowercased, accent-folded syllables plus syllable bigrams,
+    since Vietnamese words are usually two space-separated syllables ("hội nghị", "địa điểm")
+    """
+    for prefix in TASK_PREFIXES:
+        if text.startswith(prefix):
+            text = text[len(prefix):]
+            break
+    syllables = TOKEN_PATTERN.findall(fold_diacritics(unicodedata.normalize("NFC", text)).lower())
+    bigrams = [f"{a}_{b}" for a, b in zip(syllables, syllables[1:])]
+    return syllables + bigrams
+
+
+class BM25Index:
+    """BM25 over chunk texts, stored as a compact CSR-style inverted index"""
+
+    def __init__(self, vocabulary, indptr, doc_ids, term_freqs, doc_lengths, documents, k1=1.5, b=0.75):
+        self.vocabulary = vocabulary
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+        document_freqs = np.diff(indptr)
+        n = len(documents)
+        self.idf = np.log(1 + (n - document_freqs + 0.5) / (document_freqs + 0.5)).astype(np.float32)
+
+    def __len__(self):
+        return len(self.documents)
+
+    @classmethod
+    def build(cls, documents, k1=1.5, b=0.75):
+        postings = {}
+        doc_lengths = np.zeros(len(documents), dtype=np.int32)
+        for doc_id, doc in enumerate(documents):
+            tokens = tokenize(doc.page_content)
+            doc_lengths[doc_id] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                postings.setdefault(token, []).append((doc_id, count))
+
+        vocabulary = {}
+        indptr = [0]
+        doc_ids = []
+        term_freqs = []
+        for token in sorted(postings):
+            vocabulary[token] = len(vocabulary)
+            for doc_id, count in postings[token]:
+                doc_ids.append(doc_id)
+                term_freqs.append(count)
+            indptr.append(len(doc_ids))
+
+        return cls(
+            vocabulary,
+            np.asarray(indptr, dtype=np.int64),
+            np.asarray(doc_ids, dtype=np.int32),
+            np.asarray(term_freqs, dtype=np.uint16),
+            doc_lengths,
+            documents,
+            k1=k1,
+            b=b
+        )
+
+    @classmethod
+    def load(cls, index_dir):
+        arrays = np.load(os.path.join(index_dir, "postings.npz"))
+        with open(os.path.join(index_dir, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = {token: i for i, token in enumerate(json.load(f))}
+        with open(os.path.join(index_dir, "documents.json"), encoding="utf-8") as f:
+            documents = [Document(page_content=r["content"], metadata=r["metadata"]) for r in json.load(f)]
+        return cls(vocabulary, arrays["indptr"], arrays["doc_ids"], arrays["term_freqs"], arrays["doc_lengths"], documents)
+
+    @classmethod
+    def load_or_build(cls, index_dir, documents):
+        """Load the saved index if it was built from exactly these documents, otherwise rebuild and save it"""
+        signature = documents_signature(documents)
+        meta_path = os.path.join(index_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                if json.load(f).get("signature") == signature:
+                    return cls.load(index_dir)
+        index = cls.build(documents)
+        index.save(index_dir)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"signature": signature}, f)
+        return index
+
+    def save(self, index_dir):
+        os.makedirs(index_dir, exist_ok=True)
+        np.savez_compressed(
+            os.path.join(index_dir, "postings.npz"),
+            indptr=self.indptr,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths
+        )
+        with open(os.path.join(index_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(sorted(self.vocabulary, key=self.vocabulary.get), f, ensure_ascii=False)
+        with open(os.path.join(index_dir, "documents.json"), "w", encoding="utf-8") as f:
+            json.dump([{"content": d.page_content, "metadata": d.metadata} for d in self.documents], f, ensure_ascii=False)
+
+    def search(self, query, k=5, rows=None):
+        """Return [(doc_id, score)] for the k best BM25 matches, optionally only among `rows`"""
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for token in set(tokenize(query)):
+            term_id = self.vocabulary.get(token)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            ids = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end].astype(np.float32)
+            scores[ids] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + length_norm[ids])
+
+        matched = np.flatnonzero(scores)
+        if rows is not None:
+            matched = np.intersect1d(matched, rows, assume_unique=True)
+        if len(matched) == 0:
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+
+def documents_signature(documents):
+    """
+    Hash of the texts and metadata of a document list, used to tell whether a saved index is
+    stale; metadata counts too, since the saved documents also back the metadata filters
+    """
+    digest = hashlib.sha256()
+    for doc in documents:
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(doc.metadata, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse ranked lists of documents: score(d) = sum(1 / (k + rank)). Returns documents best first."""
+    scores = {}
+    documents = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            key = doc.page_content
+            documents.setdefault(key, doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return [documents[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever(BaseRetriever):
+    """Dense retriever results fused with BM25 matches through reciprocal rank fusion"""
+
+    dense_retriever: Any
+    lexical_index: Any
+    k: int = 5
+    candidate_k: int = 20
+    rrf_k: int = 60
+    rows: Any = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        dense_docs = self.dense_retriever.get_relevant_documents(query)
+        lexical_hits = self.lexical_index.search(query, self.candidate_k, rows=self.rows)
+        lexical_docs = [self.lexical_index.documents[doc_id] for doc_id, _ in lexical_hits]
+        return reciprocal_rank_fusion([dense_docs, lexical_docs], k=self.rrf_k)[:self.k]
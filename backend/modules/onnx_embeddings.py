@@ -0,0 +1,131 @@
+import json
+import os
+import shutil
+
+import numpy as np
+
+
+MODEL_FILENAME = "model.onnx"
+META_FILENAME = "meta.json"
+
+
+def export_onnx_model(model_name, output_dir, quantize=True, opset=14):
+    """
+    Export a Hugging Face encoder to ONNX and (by default) apply dynamic int8 quantization.
+    Needs torch, transformers and onnxruntime; only the export step needs torch.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    # e5-large is over the 2 GB protobuf limit in fp32, so the intermediate export keeps its
+    # weights as external data in a scratch directory that is removed after quantization
+    fp32_dir = os.path.join(output_dir, "fp32")
+    os.makedirs(fp32_dir, exist_ok=True)
+    fp32_path = os.path.join(fp32_dir, MODEL_FILENAME)
+    sample = tokenizer(["query: export"], return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            (sample["input_ids"], sample["attention_mask"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"}
+            },
+            opset_version=opset
+        )
+
+    model_path = os.path.join(output_dir, MODEL_FILENAME)
+    if quantize:
+        quantize_dynamic(fp32_path, model_path, weight_type=QuantType.QInt8)
+        shutil.rmtree(fp32_dir)
+    else:
+        for filename in os.listdir(fp32_dir):
+            os.replace(os.path.join(fp32_dir, filename), os.path.join(output_dir, filename))
+        os.rmdir(fp32_dir)
+
+    tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, META_FILENAME), "w", encoding="utf-8") as f:
+        json.dump({"model": model_name, "quantized": quantize, "opset": opset}, f)
+    return model_path
+
+
+class OnnxEmbeddingModel:
+    """
+    Drop-in for the e5 SentenceTransformer on CPU: ONNX Runtime inference with the same
+    mean pooling and L2 normalization, exposing the encode() subset E5Embeddings uses
+    """
+
+    def __init__(self, model_dir, intra_op_threads=0, max_seq_length=512):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0 lets ONNX Runtime use one thread per physical core
+        options.intra_op_num_threads = intra_op_threads
+        options.inter_op_num_threads = 1
+
+        self.model_dir = model_dir
+        self.max_seq_length = max_seq_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, MODEL_FILENAME),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+
+    @classmethod
+    def load_or_export(cls, model_name, model_dir, intra_op_threads=0, quantize=True):
+        """Load the exported model, exporting it first if missing or built from another model"""
+        meta_path = os.path.join(model_dir, META_FILENAME)
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+        if meta is None or meta.get("model") != model_name or meta.get("quantized") != quantize:
+            export_onnx_model(model_name, model_dir, quantize=quantize)
+        return cls(model_dir, intra_op_threads=intra_op_threads)
+
+    def encode(self, texts, normalize_embeddings=True, batch_size=32, **kwargs):
+        if isinstance(texts, str):
+            texts = [texts]
+
+        # Batch texts of similar length together so padding stays small, then restore the order
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = self.tokenizer(
+                [texts[i] for i in indices],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            attention_mask = batch["attention_mask"].astype(np.int64)
+            hidden = self.session.run(None, {
+                "input_ids": batch["input_ids"].astype(np.int64),
+                "attention_mask": attention_mask
+            })[0]
+
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            for i, vector in zip(indices, pooled):
+                vectors[i] = vector
+
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        embeddings = np.vstack(vectors).astype(np.float32)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings /= np.clip(norms, 1e-12, None)
+        return embeddings
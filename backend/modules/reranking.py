@@ -0,0 +1,136 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List
+
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain.schema import BaseRetriever, Document
+
+from .lexical import TASK_PREFIXES
+from .tracing import span
+
+
+# Cross-encoders are loaded once per process, like the e5 embedding model
+_cross_encoder_registry = {}
+_registry_lock = threading.Lock()
+
+
+def get_cross_encoder(model_name, max_length=512):
+    """Return the shared CrossEncoder for model_name, loading it on first use"""
+    model = _cross_encoder_registry.get(model_name)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        model = _cross_encoder_registry.get(model_name)
+        if model is None:
+            from sentence_transformers import CrossEncoder
+            model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+            _cross_encoder_registry[model_name] = model
+    return model
+
+
+def strip_task_prefix(text):
+    """Remove the e5 "query: " / "passage: " prefix; the cross-encoder was not trained with it"""
+    for prefix in TASK_PREFIXES:
+        if text.startswith(prefix):
+            return text[len(prefix):]
+    return text
+
+
+class CrossEncoderReranker:
+    """Scores (query, chunk) pairs in batches and keeps an LRU cache of scores"""
+
+    def __init__(self, model, batch_size=16, cache_size=4096):
+        self.model = model
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._scores = OrderedDict()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.total_time = 0.0
+        self.total_model_time = 0.0
+
+    def score(self, query, documents):
+        """Return one relevance score per document, scoring only uncached pairs with the model"""
+        query = strip_task_prefix(query)
+        keys = [self._pair_key(query, doc.page_content) for doc in documents]
+
+        scores = [None] * len(documents)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._scores.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._scores.move_to_end(key)
+                    scores[i] = cached
+            self.cache_hits += len(documents) - len(missing)
+
+        if missing:
+            pairs = [(query, strip_task_prefix(documents[i].page_content)) for i in missing]
+            model_start = time.perf_counter()
+            predicted = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            model_time = time.perf_counter() - model_start
+
+            with self._lock:
+                for i, value in zip(missing, predicted):
+                    scores[i] = float(value)
+                    self._scores[keys[i]] = scores[i]
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+                self.pairs_scored += len(missing)
+                self.total_model_time += model_time
+        return scores
+
+    def rerank(self, query, documents, top_k):
+        """Return the top_k documents by cross-encoder score, with the score added to their metadata"""
+        start = time.perf_counter()
+        if not documents:
+            return []
+
+        with span("rerank"):
+            scores = self.score(query, documents)
+        ranked = sorted(zip(documents, scores), key=lambda pair: pair[1], reverse=True)[:top_k]
+        reranked = [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, "rerank_score": score})
+            for doc, score in ranked
+        ]
+
+        with self._lock:
+            self.calls += 1
+            self.total_time += time.perf_counter() - start
+        return reranked
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "pairs_scored": self.pairs_scored,
+                "cache_hits": self.cache_hits,
+                "cached_pairs": len(self._scores),
+                "avg_rerank_ms": round(1000 * self.total_time / self.calls, 2) if self.calls else 0.0,
+                "avg_pair_ms": round(1000 * self.total_model_time / self.pairs_scored, 3) if self.pairs_scored else 0.0
+            }
+
+    def _pair_key(self, query, text):
+        return (query, hashlib.sha1(text.encode("utf-8")).hexdigest())
+
+
+class RerankingRetriever(BaseRetriever):
+    """Fetches candidates from another retriever and keeps the k best by cross-encoder score"""
+
+    base_retriever: Any
+    reranker: Any
+    k: int = 5
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        candidates = self.base_retriever.get_relevant_documents(query)
+        return self.reranker.rerank(query, candidates, self.k)
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import os
+from typing import Any, List
+
+import numpy as np
+from langchain.callbacks.manager import CallbackManagerForRetrieverRun
+from langchain.schema import BaseRetriever, Document
+
+
+def documents_fingerprint(ids, metadatas):
+    """Chunk count plus a hash of the ids and page hashes (which change when a page is re-ingested in place)"""
+    digest = hashlib.sha1()
+    for doc_id, metadata in sorted(zip(ids, metadatas), key=lambda item: item[0]):
+        digest.update(f"{doc_id}:{(metadata or {}).get('page_hash', '')}\n".encode("utf-8"))
+    return f"{len(ids)}-{digest.hexdigest()}"
+
+
+def collection_fingerprint(collection):
+    """Fingerprint of a Chroma collection, read without fetching its embeddings or texts"""
+    data = collection.get(include=["metadatas"])
+    return documents_fingerprint(data["ids"], data["metadatas"])
+
+
+class NumpyVectorIndex:
+    """Exact top-k search over a (memory-mapped) matrix of normalized chunk embeddings"""
+
+    # Rows scored per step when the matrix is stored as float16, bounding the float32 upcast
+    BLOCK_ROWS = 65536
+
+    def __init__(self, embeddings, documents, ids=None, fingerprint=None):
+        self.embeddings = embeddings
+        self.documents = documents
+        self.ids = ids or [str(i) for i in range(len(documents))]
+        # Fingerprint of the collection this index was exported from (see collection_fingerprint)
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.documents)
+
+    @classmethod
+    def from_chroma(cls, collection):
+        """Export every vector, text and metadata from a Chroma collection"""
+        data = collection.get(include=["embeddings", "documents", "metadatas"])
+        embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings = embeddings / np.where(norms == 0, 1, norms)
+        documents = [
+            Document(page_content=text, metadata=metadata or {})
+            for text, metadata in zip(data["documents"], data["metadatas"])
+        ]
+        return cls(embeddings, documents, list(data["ids"]), fingerprint=documents_fingerprint(data["ids"], data["metadatas"]))
+
+    @staticmethod
+    def stored_fingerprint(index_dir):
+        """Fingerprint saved with the export in index_dir, or None for a missing or older export"""
+        path = os.path.join(index_dir, "fingerprint.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("fingerprint")
+
+    @classmethod
+    def load(cls, index_dir, mmap=True):
+        """Load an index saved with save(); the matrix is memory-mapped by default"""
+        embeddings = np.load(os.path.join(index_dir, "embeddings.npy"), mmap_mode="r" if mmap else None)
+        with open(os.path.join(index_dir, "documents.json"), encoding="utf-8") as f:
+            records = json.load(f)
+        documents = [Document(page_content=r["content"], metadata=r["metadata"]) for r in records]
+        return cls(embeddings, documents, [r["id"] for r in records], fingerprint=cls.stored_fingerprint(index_dir))
+
+    @classmethod
+    def load_or_export(cls, index_dir, collection, dtype="float32", **load_options):
+        """
+        Load the index from index_dir, exporting it from the Chroma collection on first use and
+        whenever the collection changed since the export (e.g. ingestion ran while the API was down)
+        """
+        if cls.stored_fingerprint(index_dir) != collection_fingerprint(collection):
+            cls.from_chroma(collection).save(index_dir, dtype=dtype)
+        return cls.load(index_dir, **load_options)
+
+    @classmethod
+    def export(cls, index_dir, collection, dtype="float32", **load_options):
+        """Re-export the collection (e.g. after re-indexing) and load the fresh index"""
+        cls.from_chroma(collection).save(index_dir, dtype=dtype)
+        return cls.load(index_dir, **load_options)
+
+    def save(self, index_dir, dtype="float32"):
+        os.makedirs(index_dir, exist_ok=True)
+        records = [
+            {"id": doc_id, "content": doc.page_content, "metadata": doc.metadata}
+            for doc_id, doc in zip(self.ids, self.documents)
+        ]
+        # Write to temporary files and rename, so readers still mapping the old matrix are unaffected
+        embeddings_path = os.path.join(index_dir, "embeddings.npy")
+        documents_path = os.path.join(index_dir, "documents.json")
+        with open(f"{embeddings_path}.tmp", "wb") as f:
+            np.save(f, np.asarray(self.embeddings, dtype=dtype))
+        with open(f"{documents_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+        os.replace(f"{embeddings_path}.tmp", embeddings_path)
+        os.replace(f"{documents_path}.tmp", documents_path)
+        # Written last, so an interrupted export is never mistaken for a current one
+        fingerprint_path = os.path.join(index_dir, "fingerprint.json")
+        with open(f"{fingerprint_path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"fingerprint": self.fingerprint}, f)
+        os.replace(f"{fingerprint_path}.tmp", fingerprint_path)
+
+    def search(self, query_embedding, k=5, rows=None):
+        """Return [(row, score)] for the k most similar chunks"""
+        return self.search_batch([query_embedding], k, rows=rows)[0]
+
+    def search_batch(self, query_embeddings, k=5, rows=None):
+        """
+        Score all queries with one matmul and select the top k per query with argpartition.
+        `rows` (sorted row ids from a metadata pre-filter) restricts scoring to those chunks.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        scores = self._scores(queries, rows)
+
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row_scores, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row_scores[candidates])]
+            results.append([(int(i if rows is None else rows[i]), float(row_scores[i])) for i in ordered])
+        return results
+
+    def _scores(self, queries, rows=None):
+        if rows is not None:
+            # Only the filtered rows are read (and upcast) from the matrix
+            return queries @ np.asarray(self.embeddings[rows], dtype=np.float32).T
+        if self.embeddings.dtype == np.float32:
+            return queries @ np.asarray(self.embeddings).T
+        # float16 storage: upcast block by block so memory stays bounded
+        blocks = []
+        for start in range(0, len(self.embeddings), self.BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32)
+            blocks.append(queries @ block.T)
+        return np.concatenate(blocks, axis=1) if blocks else np.zeros((len(queries), 0), dtype=np.float32)
+
+    def get_documents(self, hits):
+        return [self.documents[row] for row, _ in hits]
+
+
+class NumpyRetriever(BaseRetriever):
+    """LangChain retriever backed by a NumpyVectorIndex"""
+
+    index: Any
+    embedding_function: Any
+    k: int = 5
+    rows: Any = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        query_embedding = self.embedding_function.embed_query(query)
+        return self.index.get_documents(self.index.search(query_embedding, self.k, rows=self.rows))
+
+
+class EmptyRetriever(BaseRetriever):
+    """Retriever for a metadata filter that matches no chunks"""
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return []
+
+
+class QuantizedVectorIndex(NumpyVectorIndex):
+    """
+    Two-pass search for keeping many collections resident: compact int8 (scalar) or binary
+    (sign bit) codes held in memory select candidates, which are then rescored exactly
+    against the float vectors in the memory-mapped matrix
+    """
+
+    MODES = ("int8", "binary")
+    # Rows upcast at a time in the int8 pass; small enough for the float copy to stay in cache
+    CODE_BLOCK_ROWS = 4096
+    # Set bits per byte value, for Hamming distances over packed sign bits
+    POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint16)
+
+    def __init__(self, embeddings, documents, ids=None, fingerprint=None, mode="int8", rescore_multiplier=8):
+        super().__init__(embeddings, documents, ids, fingerprint)
+        if mode not in self.MODES:
+            raise Exception(f"Unknown quantization mode '{mode}', expected one of {self.MODES}")
+        self.mode = mode
+        self.rescore_multiplier = rescore_multiplier
+        self.codes = None
+        self.scales = None
+        self.center = None
+
+    @classmethod
+    def load(cls, index_dir, mode="int8", rescore_multiplier=8):
+        """Memory-map the float matrix and load (building them if stale) the in-memory codes"""
+        index = super().load(index_dir, mmap=True)
+        index.mode = mode
+        index.rescore_multiplier = rescore_multiplier
+        index.load_or_build_codes(index_dir)
+        return index
+
+    def load_or_build_codes(self, index_dir):
+        """Codes are cached next to the matrix and rebuilt whenever the matrix is re-exported"""
+        codes_path = os.path.join(index_dir, f"codes_{self.mode}.npz")
+        source_mtime = os.path.getmtime(os.path.join(index_dir, "embeddings.npy"))
+        if os.path.exists(codes_path):
+            stored = np.load(codes_path)
+            if float(stored["source_mtime"]) == source_mtime and len(stored["codes"]) == len(self):
+                self.codes = stored["codes"]
+                self.scales = stored["scales"] if self.mode == "int8" else None
+                self.center = stored["center"] if self.mode == "binary" else None
+                return
+
+        self.build_codes()
+        empty = np.zeros(0, dtype=np.float32)
+        with open(f"{codes_path}.tmp", "wb") as f:
+            np.savez(
+                f,
+                codes=self.codes,
+                scales=self.scales if self.scales is not None else empty,
+                center=self.center if self.center is not None else empty,
+                source_mtime=np.float64(source_mtime)
+            )
+        os.replace(f"{codes_path}.tmp", codes_path)
+
+    def build_codes(self):
+        """Quantize the float matrix block by block so it is never fully upcast in memory"""
+        rows = len(self.embeddings)
+        if self.mode == "binary":
+            # e5 vectors share a large common component, so signs are taken around the mean vector;
+            # raw signs would be nearly identical across chunks
+            total = np.zeros(self.embeddings.shape[1], dtype=np.float64)
+            for start in range(0, rows, self.BLOCK_ROWS):
+                total += np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32).sum(axis=0)
+            self.center = (total / max(rows, 1)).astype(np.float32)
+            self.codes = np.zeros((rows, (self.embeddings.shape[1] + 7) // 8), dtype=np.uint8)
+            for start in range(0, rows, self.BLOCK_ROWS):
+                block = np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32)
+                self.codes[start:start + len(block)] = np.packbits(block > self.center, axis=1)
+            return
+
+        # Symmetric per-dimension scales, so every dimension uses the full int8 range
+        max_abs = np.zeros(self.embeddings.shape[1], dtype=np.float32)
+        for start in range(0, rows, self.BLOCK_ROWS):
+            block = np.abs(np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32))
+            max_abs = np.maximum(max_abs, block.max(axis=0))
+        self.scales = np.where(max_abs == 0, 1.0, max_abs / 127.0).astype(np.float32)
+        self.codes = np.empty(self.embeddings.shape, dtype=np.int8)
+        for start in range(0, rows, self.BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + self.BLOCK_ROWS], dtype=np.float32)
+            self.codes[start:start + len(block)] = np.clip(np.rint(block / self.scales), -127, 127)
+
+    def memory_bytes(self):
+        """Bytes held in RAM for first-pass search (the float matrix stays on disk / page cache)"""
+        extra = self.scales if self.mode == "int8" else self.center
+        return self.codes.nbytes + extra.nbytes
+
+    def search_batch(self, query_embeddings, k=5, rows=None):
+        """Pick k * rescore_multiplier candidates from the codes, then rescore them with float vectors"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        size = len(self) if rows is None else len(rows)
+        k = min(k, size)
+        if k <= 0:
+            return [[] for _ in range(len(queries))]
+        n_candidates = min(size, k * self.rescore_multiplier)
+
+        results = []
+        for query, approximate in zip(queries, self._approximate_scores(queries, rows)):
+            candidates = np.argpartition(-approximate, n_candidates - 1)[:n_candidates]
+            if rows is not None:
+                candidates = rows[candidates]
+            # Sorted row order keeps the reads from the memory-mapped matrix sequential
+            candidates.sort()
+            exact = np.asarray(self.embeddings[candidates], dtype=np.float32) @ query
+            best = np.argsort(-exact)[:k]
+            results.append([(int(candidates[i]), float(exact[i])) for i in best])
+        return results
+
+    def _approximate_scores(self, queries, rows=None):
+        codes = self.codes if rows is None else self.codes[rows]
+        if self.mode == "binary":
+            # Negative Hamming distance between the sign bits of the query and of every chunk
+            query_bits = np.packbits(queries > self.center, axis=1)
+            return [-self.POPCOUNT[np.bitwise_xor(codes, bits)].sum(axis=1, dtype=np.int32) for bits in query_bits]
+
+        # Fold the per-dimension scales into the query so the codes are only cast, never rescaled
+        scaled = queries * self.scales
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+        buffer = np.empty((min(self.CODE_BLOCK_ROWS, len(codes)), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), self.CODE_BLOCK_ROWS):
+            block = codes[start:start + self.CODE_BLOCK_ROWS]
+            np.copyto(buffer[:len(block)], block, casting="unsafe")
+            scores[:, start:start + len(block)] = scaled @ buffer[:len(block)].T
+        return scores
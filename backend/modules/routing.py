@@ -0,0 +1,284 @@
+import re
+import threading
+from calendar import monthrange
+
+from .lexical import fold_diacritics
+from .table_store import MONTHS
+
+
+MONTH_WORDS = dict(MONTHS, **{name[:3]: number for name, number in MONTHS.items()})
+YEAR = re.compile(r"20\d\d")
+ACRONYM_TOKEN = re.compile(r"\b[A-Z][A-Z0-9&]{1,9}\b")
+WORD = re.compile(r"\w+")
+# Words too generic to identify an event by name
+NAME_STOPWORDS = {"apec", "meeting", "meetings", "and", "the", "of", "on", "for", "in", "a", "an", "s", "related"}
+
+# Whitelist of question shapes, matched against the whole lowercased, accent-folded question after the
+# event it names becomes EVENT and its month, year and city become MONTH, YEAR and VENUE. Anything left
+# over (a second clause, an ordinal such as "third" or "lần thứ 3", "next week", "open to the public",
+# ...) makes the match fail and the question goes through the full RAG path.
+EVENT = r"(?:the )?(?:apec )?(?:YEAR )?(?:(?:cac )?(?:hoi nghi|cuoc hop|su kien) )?EVENT(?: meetings?| events?)?"
+FACET = r"(?:MONTH(?: YEAR)?|VENUE|YEAR)"
+FACETS = rf"(?: (?:in|during|at|for|on) {FACET}){{0,2}}"
+VI_FACET = r"(?:(?:thang )?MONTH(?: nam YEAR)?|VENUE|nam YEAR)"
+VI_FACETS = rf"(?: (?:(?:tai|o|trong|vao) )?{VI_FACET}){{0,2}}"
+EVENT_PATTERNS = [
+    # "When is the SOM2?" / "What are the dates of the APEC Economic Leaders' Week?" / "Where is the EMM held?"
+    rf"(?:when|what (?:date|dates|day|days)) (?:is|are|will) {EVENT}(?: (?:be )?(?:held|hosted|taking place|happening))?{FACETS}",
+    rf"when (?:does|do|will) {EVENT} (?:take place|start|begin|happen|be held){FACETS}",
+    rf"what (?:is|are) the (?:date|dates|schedule) (?:of|for) {EVENT}{FACETS}",
+    rf"where (?:is|are|will) {EVENT}(?: (?:be )?(?:held|hosted|taking place|happening|located))?{FACETS}",
+    rf"where (?:does|do|will) {EVENT} (?:take place|happen|be held){FACETS}",
+    rf"what (?:is|are) the (?:venue|venues|location|locations) (?:of|for) {EVENT}{FACETS}",
+    rf"(?:which|what) {EVENT} (?:is|are) (?:scheduled|held|planned|taking place){FACETS}",
+    # "Hội nghị SOM3 diễn ra khi nào?" / "MRT tổ chức ở đâu?" / "Khi nào diễn ra MRT?"
+    rf"{EVENT}{VI_FACETS}(?: se)?(?: duoc)? (?:dien ra|to chuc|hop)(?: (?:vao|luc))? (?:khi nao|luc nao|bao gio|ngay nao|thoi gian nao)",
+    rf"{EVENT}{VI_FACETS}(?: se)?(?: duoc)? (?:dien ra|to chuc|hop) (?:o|tai) (?:dau|noi nao)",
+    rf"(?:khi nao|bao gio|ngay nao)(?: se)? (?:dien ra|to chuc|co) {EVENT}",
+    rf"(?:thoi gian|ngay|dia diem|noi) (?:(?:dien ra|to chuc) )?(?:cua )?{EVENT}(?: la)?(?: (?:khi nao|ngay nao|o dau|gi))?",
+]
+LISTING_PATTERNS = [
+    # "Which meetings take place in Jeju?" / "Meetings in May" / "Show me the events in August 2025 in Incheon"
+    rf"(?:which|what) (?:apec )?(?:side )?(?:meetings|events)(?: (?:are|is|will be))?(?: (?:held|hosted|scheduled|planned|taking place|take place|happening|happen|there))?{FACETS}",
+    rf"(?:the )?(?:apec )?(?:side )?(?:meetings|events|schedule|calendar)(?: (?:scheduled|held))?{FACETS}",
+    rf"(?:list|show)(?: me)?(?: the| all)?(?: apec)? (?:side )?(?:meetings|events){FACETS}",
+    rf"what (?:is|are) the (?:apec )?(?:schedule|calendar)(?: of (?:meetings|events))?{FACETS}",
+    # "Những hội nghị nào diễn ra tại Incheon?" / "Lịch họp tháng 5 ở Jeju" / "Các cuộc họp trong tháng 5"
+    rf"(?:nhung|cac) (?:hoi nghi|cuoc hop|su kien)(?: apec)? nao(?: se)?(?: duoc)? (?:dien ra|to chuc|hop){VI_FACETS}",
+    rf"lich(?: (?:hop|trinh|su kien|cac cuoc hop|cac su kien|cac hoi nghi))?(?: apec)?{VI_FACETS}",
+    rf"(?:cac )?(?:hoi nghi|cuoc hop|su kien)(?: apec)?(?: (?:dien ra|to chuc))?{VI_FACETS}",
+]
+EVENT_SHAPES = [re.compile(pattern) for pattern in EVENT_PATTERNS]
+LISTING_SHAPES = [re.compile(pattern) for pattern in LISTING_PATTERNS]
+
+TEMPLATES = {
+    "en": {
+        "events": "Here are the matching APEC events from the official schedule:",
+        "period": "APEC {year} events{venue} in {month}:",
+        "venue": "APEC {year} events in {venue}:",
+        "no_date": "date to be announced",
+        "closing": "Would you like more details about any of these events?",
+    },
+    "vi": {
+        "events": "Dưới đây là các sự kiện APEC phù hợp theo lịch chính thức:",
+        "period": "Các sự kiện APEC {year}{venue} trong tháng {month}:",
+        "venue": "Các sự kiện APEC {year} tại {venue}:",
+        "no_date": "chưa công bố ngày",
+        "closing": "Bạn có muốn biết thêm chi tiết về sự kiện nào không?",
+    },
+}
+
+
+class TableQueryRouter:
+    """
+    Fast path for schedule and venue lookups: "when/where is <event>" questions and plain listings of
+    the events in a month or city are answered from the table store. Only questions that match one of
+    the whitelisted shapes in full are routed; anything else returns None and goes through RAG.
+    """
+
+    def __init__(self, store, max_rows=30):
+        self.store = store
+        self.max_rows = max_rows
+        self.acronyms = set(store.acronyms())
+        self.name_keys = self._name_keys(store.event_names())
+        self.venue_keys = sorted((key.split() for key in store.venue_keys()), key=len, reverse=True)
+        self.years = store.years()
+        # Listings without a year are about the hosting year, not every year in the tables
+        self.default_year = max(self.years) if self.years else None
+        self.routed = 0
+        self.fallback = 0
+        self._lock = threading.Lock()
+
+    def route(self, question, language="en"):
+        """Return a chatbot response dict answered from the tables, or None to fall back to RAG"""
+        events, heading = self._match(question, language)
+        with self._lock:
+            if events:
+                self.routed += 1
+            else:
+                self.fallback += 1
+        if not events:
+            return None
+
+        answer = self._format_answer(events[:self.max_rows], heading, language)
+        sources = self._format_sources(events)
+        return {
+            "answer": answer,
+            "sources": sources,
+            "num_sources": len(sources),
+            "detected_language": language,
+            "route": "table"
+        }
+
+    def stats(self):
+        total = self.routed + self.fallback
+        return {
+            "events": len(self.store),
+            "routed": self.routed,
+            "fallback": self.fallback,
+            "routed_rate": round(self.routed / total, 3) if total else 0.0
+        }
+
+    def _match(self, question, language):
+        templates = TEMPLATES.get(language, TEMPLATES["en"])
+        tokens = WORD.findall(fold_diacritics(question).lower().replace("’", "'"))
+
+        acronyms, acronym_tokens = self._event_acronyms(question)
+        event_ids, name_words = self._named_events(tokens)
+        shape, facets = self._shape(tokens, acronym_tokens | name_words)
+        if shape is None:
+            return [], None
+
+        if "EVENT" in shape:
+            if not any(pattern.fullmatch(shape) for pattern in EVENT_SHAPES):
+                return [], None
+            if acronyms:
+                events = self.store.find_events(acronyms=acronyms, periods=self._periods(facets), venue_keys=facets["venues"])
+            else:
+                events = self.store.find_events(event_ids=event_ids, periods=self._periods(facets), venue_keys=facets["venues"])
+            return self._in_years(events, facets["years"], keep_undated=True), templates["events"]
+
+        # Plain listings need a month or a city; "events in 2025" alone is too broad to be useful
+        if not (facets["months"] or facets["venues"]) or not any(pattern.fullmatch(shape) for pattern in LISTING_SHAPES):
+            return [], None
+        years = facets["years"] or [self.default_year]
+        events = self.store.find_events(periods=self._periods(facets, years), venue_keys=facets["venues"])
+        events = self._in_years(events, years, keep_undated=not facets["months"] and not facets["years"])
+        if not events:
+            return [], None
+
+        year = ", ".join(str(year) for year in years)
+        venue_names = ", ".join(sorted({event["venue"].split(",")[0] for event in events})) if facets["venues"] else ""
+        if not facets["months"]:
+            heading = templates["venue"].format(year=year, venue=venue_names)
+        else:
+            month = facets["months"][0]
+            month_name = str(month) if language == "vi" else list(MONTHS)[month - 1].capitalize()
+            venue_part = ""
+            if venue_names:
+                venue_part = f" tại {venue_names}" if language == "vi" else f" in {venue_names}"
+            heading = templates["period"].format(year=year, venue=venue_part, month=month_name)
+        return events, heading
+
+    def _shape(self, tokens, entity_words):
+        """
+        The question with its event mention collapsed into EVENT and its months, years and cities into
+        MONTH, YEAR and VENUE, plus the values found; the shape is None when the event words are scattered
+        """
+        positions = [i for i, token in enumerate(tokens) if token in entity_words]
+        if positions:
+            first, last = positions[0], positions[-1]
+            if any(token not in entity_words and token not in NAME_STOPWORDS for token in tokens[first:last + 1]):
+                return None, None
+            tokens = tokens[:first] + ["EVENT"] + tokens[last + 1:]
+
+        facets = {"months": [], "years": [], "venues": []}
+        shape = []
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            venue = next((key for key in self.venue_keys if tokens[i:i + len(key)] == key), None)
+            if venue is not None:
+                facets["venues"].append(" ".join(venue))
+                shape.append("VENUE")
+                i += len(venue)
+                continue
+            if YEAR.fullmatch(token):
+                facets["years"].append(int(token))
+                shape.append("YEAR")
+            elif token.isdigit() and shape and shape[-1] == "thang" and 1 <= int(token) <= 12:
+                # "tháng 5"
+                facets["months"].append(int(token))
+                shape.append("MONTH")
+            elif token in MONTH_WORDS and (token != "may" or (shape and shape[-1] in ("in", "of", "during", "for"))):
+                # "may" is also a verb, so it only counts as a month after "in"/"of"/"during"/"for"
+                facets["months"].append(MONTH_WORDS[token])
+                shape.append("MONTH")
+            else:
+                shape.append(token)
+            i += 1
+        return " ".join(shape), facets
+
+    def _periods(self, facets, years=None):
+        """Date ranges of the months asked about, in the given years (or every year in the tables)"""
+        years = years or facets["years"] or self.years
+        return [
+            (f"{year}-{month:02d}-01", f"{year}-{month:02d}-{monthrange(year, month)[1]:02d}")
+            for month in facets["months"] for year in years
+        ]
+
+    @staticmethod
+    def _in_years(events, years, keep_undated=False):
+        if not years:
+            return events
+        prefixes = {str(year) for year in years}
+        return [
+            event for event in events
+            if (event["start_date"] and event["start_date"][:4] in prefixes) or (keep_undated and not event["start_date"])
+        ]
+
+    def _event_acronyms(self, question):
+        """
+        Known acronyms in the question and the (lowercased) words that named them; "SOM" also
+        matches the numbered SOM1, SOM2 and SOM3
+        """
+        found, tokens = [], set()
+        for token in ACRONYM_TOKEN.findall(question):
+            for acronym in self.acronyms:
+                if acronym == token or (acronym.startswith(token) and acronym[len(token):].isdigit()):
+                    found.append(acronym)
+                    tokens.add(token.lower())
+        return sorted(set(found)), tokens
+
+    @staticmethod
+    def _name_keys(event_names):
+        """Distinctive words of each part of an event name ("A (X)- B (Y)" has two parts)"""
+        keys = []
+        for event_id, name in event_names:
+            for part in re.split(r"\)\s*-\s*|\(", fold_diacritics(name).lower().replace("’", "'")):
+                words = frozenset(WORD.findall(part)) - NAME_STOPWORDS
+                if len(words) >= 2:
+                    keys.append((words, event_id))
+        return keys
+
+    def _named_events(self, tokens):
+        """Events whose name (any part of it) is fully spelled out in the question, and the words used"""
+        words = set(tokens)
+        event_ids, name_words = set(), set()
+        for key_words, event_id in self.name_keys:
+            if key_words <= words:
+                event_ids.add(event_id)
+                name_words |= key_words
+        return sorted(event_ids), name_words
+
+    def _format_answer(self, events, heading, language):
+        templates = TEMPLATES.get(language, TEMPLATES["en"])
+        sections = {}
+        for event in events:
+            date_text = event["date_text"] if event["start_date"] else templates["no_date"]
+            venue = f", {event['venue']}" if event["venue"] else ""
+            sections.setdefault(event["section"], []).append(f"- {event['name']}: {date_text}{venue}")
+
+        # Meetings and side events come from different tables, so they are listed separately
+        blocks = [heading]
+        for section, lines in sections.items():
+            if len(sections) > 1:
+                lines = [f"**{section}**"] + lines
+            blocks.append("\n".join(lines))
+        blocks.append(templates["closing"])
+        return "\n\n".join(blocks)
+
+    def _format_sources(self, events):
+        pages = {}
+        for event in events:
+            pages.setdefault(event["url"], event)
+        return [
+            {
+                "title": event["title"],
+                "url": url,
+                "contains_table": True,
+                "chunk_length": 0,
+                "content_preview": f"{event['name']} | {event['date_text']} | {event['venue']}"
+            }
+            for url, event in pages.items()
+        ]
@@ -0,0 +1,245 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import date
+
+from .lexical import fold_diacritics
+
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12
+}
+MONTH_PATTERN = "|".join(MONTHS)
+# "May 3 - 16, 2025", "April 30 - May 1, 2025", "August 12, 2025"
+DATE_RANGE = re.compile(
+    rf"\b({MONTH_PATTERN})\s+(\d{{1,2}})(?:\s*[-–~]\s*(?:({MONTH_PATTERN})\s+)?(\d{{1,2}}))?,?\s*(\d{{4}})",
+    re.IGNORECASE
+)
+
+# Scraped form ([TABLE START] / HEADERS: / ROW n:) and cleaned chunk form (TABLE: / Columns: / Row n:)
+HEADER_LINE = re.compile(r"^(?:HEADERS|Columns):\s*(.*)$")
+ROW_LINE = re.compile(r"^(?:ROW|Row) \d+:\s*(.*)$")
+ACRONYM = re.compile(r"\(([A-Z][A-Za-z0-9&]*[A-Z0-9])\)")
+
+# Header names recognised for each column role, lowercased
+COLUMN_ROLES = {
+    "name": ("event title", "title", "event", "meeting", "name"),
+    "date": ("date", "dates", "period"),
+    "venue": ("venue", "location", "place", "city"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    section TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    name TEXT NOT NULL,
+    date_text TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    venue TEXT NOT NULL,
+    venue_key TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS event_acronyms (
+    acronym TEXT NOT NULL,
+    event_id INTEGER NOT NULL REFERENCES events(id)
+);
+CREATE INDEX IF NOT EXISTS events_dates ON events(start_date, end_date);
+CREATE INDEX IF NOT EXISTS events_venue ON events(venue_key);
+CREATE INDEX IF NOT EXISTS event_acronyms_acronym ON event_acronyms(acronym);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def split_cells(text):
+    return [cell.strip() for cell in text.split("|")]
+
+
+def parse_tables(text):
+    """Return [{"headers": [...], "rows": [[...], ...]}] for every table in a page or chunk"""
+    tables = []
+    current = None
+    for line in text.splitlines():
+        line = line.strip()
+        header = HEADER_LINE.match(line)
+        if header:
+            current = {"headers": split_cells(header.group(1)), "rows": []}
+            tables.append(current)
+            continue
+        row = ROW_LINE.match(line)
+        if row and current is not None:
+            cells = split_cells(row.group(1))
+            # The scraper repeats the header as ROW 1
+            if cells != current["headers"]:
+                current["rows"].append(cells)
+    return tables
+
+
+def parse_date_range(text):
+    """ISO (start, end) dates for "May 3 - 16, 2025"-style cells, or (None, None)"""
+    match = DATE_RANGE.search(text.replace("–", "-"))
+    if not match:
+        return None, None
+    start_month, start_day, end_month, end_day, year = match.groups()
+    start_month = MONTHS[start_month.lower()]
+    end_month = MONTHS[end_month.lower()] if end_month else start_month
+    try:
+        start = date(int(year), start_month, int(start_day))
+        end = date(int(year), end_month, int(end_day or start_day))
+    except ValueError:
+        return None, None
+    return start.isoformat(), end.isoformat()
+
+
+def venue_key(venue):
+    """Accent-folded, lowercased city part of a venue ("Hai Phong, Vietnam" -> "hai phong")"""
+    return fold_diacritics(venue.split(",")[0]).strip().lower()
+
+
+def column_roles(headers):
+    roles = {}
+    for index, header in enumerate(headers):
+        header = header.lower().strip(" .")
+        for role, names in COLUMN_ROLES.items():
+            if role not in roles and header in names:
+                roles[role] = index
+    return roles
+
+
+class TableStore:
+    """
+    Event tables (name, dates, venue) parsed out of the scraped pages into SQLite, with
+    indexes on dates, venues and event acronyms for lookups that do not need the LLM
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        # Reads are tiny and serialized, so one connection is shared across worker threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def build(cls, path, documents, fingerprint=None):
+        """
+        Parse the tables of cleaned pages or chunks into a fresh store at path. It is written to
+        a temporary file and renamed, so a running API keeps reading the old one until it reloads.
+        fingerprint identifies the collection the documents came from (see collection_fingerprint).
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        store = cls(temporary_path)
+        for doc in documents:
+            store.add_page(doc.metadata.get("title", ""), doc.metadata.get("url", ""), doc.page_content)
+        if fingerprint is not None:
+            with store.connection:
+                store.connection.execute("INSERT INTO store_meta (key, value) VALUES ('source_fingerprint', ?)", (fingerprint,))
+        store.connection.close()
+        os.replace(temporary_path, path)
+        return cls(path)
+
+    def add_page(self, title, url, content):
+        """Parse every event table on a page; returns the number of new rows"""
+        # Section names such as "Meetings" or "Side Events" come from the page title
+        section = title.split(" > ")[0].strip() or title
+        added = 0
+        with self._lock, self.connection:
+            for table in parse_tables(content):
+                roles = column_roles(table["headers"])
+                if "name" not in roles or ("date" not in roles and "venue" not in roles):
+                    continue
+                for cells in table["rows"]:
+                    if len(cells) < len(table["headers"]):
+                        continue
+                    name = cells[roles["name"]]
+                    date_text = cells[roles["date"]] if "date" in roles else ""
+                    venue = cells[roles["venue"]] if "venue" in roles else ""
+                    # The same table is often scraped from several URLs of one page
+                    duplicate = self.connection.execute(
+                        "SELECT 1 FROM events WHERE name = ? AND date_text = ? AND venue = ?",
+                        (name, date_text, venue)
+                    ).fetchone()
+                    if duplicate or not name:
+                        continue
+                    start_date, end_date = parse_date_range(date_text)
+                    event_id = self.connection.execute(
+                        "INSERT INTO events (section, title, url, name, date_text, start_date, end_date, venue, venue_key) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (section, title, url, name, date_text, start_date, end_date, venue, venue_key(venue))
+                    ).lastrowid
+                    self.connection.executemany(
+                        "INSERT INTO event_acronyms (acronym, event_id) VALUES (?, ?)",
+                        [(acronym.upper(), event_id) for acronym in set(ACRONYM.findall(name))]
+                    )
+                    added += 1
+        return added
+
+    def _select(self, where, params):
+        with self._lock:
+            rows = self.connection.execute(f"SELECT * FROM events WHERE {where} ORDER BY start_date IS NULL, start_date, id", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def source_fingerprint(self):
+        """Fingerprint of the collection the store was built against, or None"""
+        with self._lock:
+            row = self.connection.execute("SELECT value FROM store_meta WHERE key = 'source_fingerprint'").fetchone()
+        return row["value"] if row else None
+
+    def close(self):
+        self.connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def years(self):
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT DISTINCT substr(start_date, 1, 4) AS year FROM events WHERE start_date IS NOT NULL"
+            ).fetchall()
+        return sorted(int(row["year"]) for row in rows)
+
+    def venue_keys(self):
+        with self._lock:
+            rows = self.connection.execute("SELECT DISTINCT venue_key FROM events WHERE venue_key != ''").fetchall()
+        return [row["venue_key"] for row in rows]
+
+    def acronyms(self):
+        with self._lock:
+            rows = self.connection.execute("SELECT DISTINCT acronym FROM event_acronyms").fetchall()
+        return [row["acronym"] for row in rows]
+
+    def event_names(self):
+        with self._lock:
+            rows = self.connection.execute("SELECT id, name FROM events").fetchall()
+        return [(row["id"], row["name"]) for row in rows]
+
+    def find_events(self, acronyms=(), periods=(), venue_keys=(), event_ids=()):
+        """Events matching all given facets; each facet is a list of alternatives"""
+        clauses, params = [], []
+        if event_ids:
+            clauses.append(f"id IN ({', '.join('?' * len(event_ids))})")
+            params.extend(event_ids)
+        if acronyms:
+            clauses.append(f"id IN (SELECT event_id FROM event_acronyms WHERE acronym IN ({', '.join('?' * len(acronyms))}))")
+            params.extend(acronyms)
+        if periods:
+            # Overlap with any of the periods, so multi-month events show up in each month
+            clauses.append("(" + " OR ".join("(start_date <= ? AND end_date >= ?)" for _ in periods) + ")")
+            for start, end in periods:
+                params.extend([end, start])
+        if venue_keys:
+            clauses.append(f"venue_key IN ({', '.join('?' * len(venue_keys))})")
+            params.extend(venue_keys)
+        if not clauses:
+            return []
+        return self._select(" AND ".join(clauses), params)
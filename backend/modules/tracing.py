@@ -0,0 +1,216 @@
+import threading
+import time
+from bisect import bisect_left
+
+from .config import ChatbotConfig
+
+
+# Latency buckets in seconds, from cache hits up to slow Gemini calls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Prompt size buckets in (estimated) tokens, around the default 2000-token context budget
+TOKEN_BUCKETS = (250, 500, 1000, 1500, 2000, 2500, 3000, 4000, 6000, 8000, 16000)
+
+
+class Counter:
+    """Monotonic counter with optional labels, exported in Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(labels.get(name, "") for name in self.labelnames), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, exported in Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = format_labels(self.labelnames + ("le",), key + (le,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{format_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+# Process-wide metrics shared by the chatbot and the API
+STAGE_DURATION = Histogram(
+    "apec_stage_duration_seconds", "Time spent in each request stage", labelnames=("stage",)
+)
+REQUEST_DURATION = Histogram(
+    "apec_request_duration_seconds", "End-to-end API request latency", labelnames=("endpoint",)
+)
+REQUESTS = Counter(
+    "apec_requests_total", "API requests by endpoint and outcome", labelnames=("endpoint", "status")
+)
+CACHE_EVENTS = Counter(
+    "apec_cache_events_total", "Cache lookups by cache and result", labelnames=("cache", "result")
+)
+QUERY_ROUTES = Counter(
+    "apec_query_routes_total", "Answered questions by path (table fast path or full RAG)", labelnames=("route",)
+)
+COALESCED_REQUESTS = Counter(
+    "apec_coalesced_requests_total",
+    "Requests that started a computation (leader) or joined an identical in-flight one (follower)",
+    labelnames=("endpoint", "role")
+)
+PROMPT_TOKENS = Histogram(
+    "apec_prompt_tokens", "Estimated tokens of each LLM prompt (template, context and question)",
+    labelnames=("language",), buckets=TOKEN_BUCKETS
+)
+METRICS = [STAGE_DURATION, REQUEST_DURATION, REQUESTS, CACHE_EVENTS, QUERY_ROUTES, COALESCED_REQUESTS, PROMPT_TOKENS]
+
+_local = threading.local()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Times one stage, recording it in STAGE_DURATION and in the thread's active request trace"""
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        STAGE_DURATION.observe(elapsed, stage=self.stage)
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            timings[self.stage] = round(timings.get(self.stage, 0.0) + elapsed, 4)
+        return False
+
+
+def span(stage):
+    """Context manager timing a stage; a shared no-op when tracing is disabled"""
+    if not ChatbotConfig.TRACING_ENABLED:
+        return _NULL_SPAN
+    return Span(stage)
+
+
+class RequestTrace:
+    """Collects the spans of one request on the current thread into a {stage: seconds} dict"""
+
+    def __init__(self):
+        self.timings = {}
+        self._previous = None
+
+    def __enter__(self):
+        self._previous = getattr(_local, "timings", None)
+        _local.timings = self.timings
+        return self
+
+    def __exit__(self, *exc_info):
+        _local.timings = self._previous
+        return False
+
+
+class _NullTrace:
+    timings = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TRACE = _NullTrace()
+
+
+def request_trace():
+    """Start collecting a per-request timing breakdown; a no-op (timings is None) when tracing is disabled"""
+    if not ChatbotConfig.TRACING_ENABLED:
+        return _NULL_TRACE
+    return RequestTrace()
+
+
+def count_cache_event(cache, result):
+    if ChatbotConfig.TRACING_ENABLED:
+        CACHE_EVENTS.inc(cache=cache, result=result)
+
+
+def count_query_route(route):
+    if ChatbotConfig.TRACING_ENABLED:
+        QUERY_ROUTES.inc(route=route)
+
+
+def count_coalesced_request(endpoint, role):
+    if ChatbotConfig.TRACING_ENABLED:
+        COALESCED_REQUESTS.inc(endpoint=endpoint, role=role)
+
+
+def observe_prompt_tokens(tokens, language):
+    if ChatbotConfig.TRACING_ENABLED:
+        PROMPT_TOKENS.observe(tokens, language=language)
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
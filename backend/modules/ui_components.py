@@ -1,6 +1,6 @@
 
 import streamlit as st
-from .utils import get_language_flag, get_context_suggestions
+from .utils import get_language_flag, get_context_suggestions, is_llm_suggestions_pending
 from .config import ChatbotConfig
 import hashlib
 
@@ -76,8 +76,17 @@ def render_auto_suggestions(message, llm=None):
 
     detected_language = message.get("detected_language", "en")
 
-    # Get combined context-aware suggestions (hardcoded + LLM-generated)
-    suggestions = get_context_suggestions(message["content"], detected_language, llm)
+    # Suggestions are memoized in the message itself once the LLM job has finished, so later reruns
+    # never trigger another LLM call; while it is pending each rerun picks up whatever is ready
+    suggestions = message.get("suggestions")
+    if suggestions is None:
+        # Get combined context-aware suggestions; the render waits at most SUGGESTION_WAIT_SECONDS for the
+        # LLM ones, so the hardcoded ones show right away
+        suggestions = get_context_suggestions(
+            message["content"], detected_language, llm, timeout=ChatbotConfig.SUGGESTION_WAIT_SECONDS
+        )
+        if not is_llm_suggestions_pending(message["content"], detected_language):
+            message["suggestions"] = suggestions
 
     if suggestions:
         st.markdown("---")
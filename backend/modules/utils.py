@@ -1,22 +1,76 @@
-import langdetect
+import hashlib
 import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+from .config import ChatbotConfig
+from .tracing import span
+
+# Background LLM suggestion jobs, keyed by answer hash so repeated calls reuse the same result
+_suggestion_executor = ThreadPoolExecutor(max_workers=ChatbotConfig.SUGGESTION_WORKERS, thread_name_prefix="suggestions")
+_suggestion_futures = OrderedDict()
+# When each failed or empty job finished; it stays memoized until SUGGESTION_RETRY_SECONDS have passed
+_suggestion_failed_at = {}
+_suggestion_lock = threading.Lock()
+
+
+# Vietnamese letters that never appear in English text, built once at import time
+VIETNAMESE_CHARS = frozenset('àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ')
+
+# Common Vietnamese words typed without diacritics ("apec la gi", "lich hop thang 5") and
+# English function words; only words that are unambiguous between the two languages
+VIETNAMESE_WORDS = frozenset("""
+    la gi cua nhung cac nao khong toi chung lich hop dau thang su kien diem bao nhieu duoc
+    trong nguoi nghi thong tai sao viet nam hoi ngay gio khi muon biet giup xin chao
+    nay ve voi tham du dang ky nhu nhat chi tiet
+""".split())
+ENGLISH_WORDS = frozenset("""
+    the is are was were what where when who which how why does do can will of in on at for
+    from with about and or please tell me show list there their this that these those
+    meeting meetings event events schedule venue held
+""".split())
+
+
+@lru_cache(maxsize=4096)
+def _detect_normalized_language(text):
+    lowered = text.lower()
+    if not VIETNAMESE_CHARS.isdisjoint(lowered):
+        return 'vi'
+
+    words = re.findall(r"[a-z]+", lowered)
+    vietnamese_hits = sum(1 for word in words if word in VIETNAMESE_WORDS)
+    english_hits = sum(1 for word in words if word in ENGLISH_WORDS)
+    if vietnamese_hits > english_hits:
+        return 'vi'
+    if english_hits > 0 or not ChatbotConfig.LANGDETECT_FALLBACK:
+        return 'en'
 
-def detect_language(text):
+    # Ambiguous input (e.g. only names or acronyms): fall back to seeded langdetect
     try:
-        detected = langdetect.detect(text)
-        vietnamese_chars = set('àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ')
-        has_vietnamese = any(char in vietnamese_chars for char in text.lower())
-        
-        if has_vietnamese or detected == 'vi':
-            return 'vi'
-        else:
-            return 'en'
-    except:
+        return 'vi' if get_langdetect().detect(text) == 'vi' else 'en'
+    except Exception:
         return 'en'
 
 
+@lru_cache(maxsize=1)
+def get_langdetect():
+    """Import langdetect on first use; it is randomized unless seeded, so seed it for a deterministic fallback"""
+    import langdetect
+    langdetect.DetectorFactory.seed = 0
+    return langdetect
+
+
+def detect_language(text):
+    """Detect whether text is Vietnamese or English ('vi' / 'en'), deterministically and cached"""
+    return _detect_normalized_language(unicodedata.normalize("NFC", text or "").strip())
+
+
 def get_language_flag(language):    
     return "🇻🇳" if language == "vi" else "🇺🇸"
 
@@ -182,7 +236,8 @@ Requirements:
 - No additional explanations"""
 
         # Use the LLM to generate suggestions
-        result = llm.invoke(prompt)
+        with span("suggestions_llm"):
+            result = llm.invoke(prompt)
 
         # Parse result to extract questions
         suggestions = []
@@ -215,15 +270,80 @@ Requirements:
         return []
 
 
-def get_context_suggestions(response_content, language, llm=None):
-    """Generate combined suggestions: hardcoded + LLM-generated"""
+def get_suggestion_key(response_content, language):
+    """Hash identifying the suggestions for one answer"""
+    return hashlib.md5(f"{language}:{response_content}".encode("utf-8")).hexdigest()
+
+
+def start_llm_suggestions(response_content, language, llm=None):
+    """Start generating LLM suggestions in the background and return the (possibly shared) future"""
+    if not llm:
+        return None
+
+    key = get_suggestion_key(response_content, language)
+    started = False
+    with _suggestion_lock:
+        future = _suggestion_futures.get(key)
+        failed_at = _suggestion_failed_at.get(key)
+        if future is None or (failed_at is not None and time.monotonic() - failed_at > ChatbotConfig.SUGGESTION_RETRY_SECONDS):
+            future = _suggestion_executor.submit(generate_llm_suggestions, response_content, language, llm)
+            _suggestion_futures[key] = future
+            _suggestion_failed_at.pop(key, None)
+            started = True
+            while len(_suggestion_futures) > ChatbotConfig.SUGGESTION_CACHE_SIZE:
+                evicted, _ = _suggestion_futures.popitem(last=False)
+                _suggestion_failed_at.pop(evicted, None)
+        _suggestion_futures.move_to_end(key)
+    if started:
+        # Outside the lock: the callback runs right away if the job has already finished
+        future.add_done_callback(lambda done: _record_failed_suggestions(key, done))
+    return future
+
+
+def _record_failed_suggestions(key, future):
+    """
+    Failed or empty results stay memoized (so polling clients see pending=False and no new LLM
+    call starts) but are retried by a request arriving after SUGGESTION_RETRY_SECONDS
+    """
+    if future.cancelled() or future.exception() is not None or not future.result():
+        with _suggestion_lock:
+            if _suggestion_futures.get(key) is future:
+                _suggestion_failed_at[key] = time.monotonic()
+
+
+def is_llm_suggestions_pending(response_content, language):
+    """True while the background LLM suggestions for this answer are still being generated"""
+    with _suggestion_lock:
+        future = _suggestion_futures.get(get_suggestion_key(response_content, language))
+    return future is not None and not future.done()
+
+
+def get_context_suggestions(response_content, language, llm=None, timeout=None):
+    """
+    Generate combined suggestions: hardcoded + LLM-generated.
+    LLM suggestions run in the background; timeout=None waits for them, otherwise only
+    those ready within timeout seconds are included and the hardcoded ones fill the rest.
+    """
     # Get hardcoded suggestions
-    hardcoded_suggestions = get_hardcoded_suggestions(response_content, language)
+    with span("suggestions_hardcoded"):
+        hardcoded_suggestions = get_hardcoded_suggestions(response_content, language)
+
+    # Get LLM-generated suggestions (shared with any job already started for this answer)
+    llm_suggestions = []
+    with span("suggestions_llm_wait"):
+        future = start_llm_suggestions(response_content, language, llm)
+        if future is not None:
+            try:
+                llm_suggestions = future.result(timeout=timeout)
+            except Exception:
+                llm_suggestions = []
+
+    with span("suggestions_combine"):
+        return combine_suggestions(hardcoded_suggestions, llm_suggestions)
 
-    # Get LLM-generated suggestions
-    llm_suggestions = generate_llm_suggestions(response_content, language, llm)
 
-    # Combine suggestions
+def combine_suggestions(hardcoded_suggestions, llm_suggestions):
+    """Merge hardcoded and LLM suggestions into at most 3 unique entries"""
     combined_suggestions = []
 
     # Add hardcoded suggestions first (up to 2)
@@ -243,4 +363,4 @@ def get_context_suggestions(response_content, language, llm=None):
         if len(combined_suggestions) < 3:
             combined_suggestions.append(suggestion)
 
-    return combined_suggestions[:3]  
\ No newline at end of file
+    return combined_suggestions[:3]
@@ -0,0 +1,85 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class WorkerPoolSaturated(Exception):
+    """Raised when the wait queue is full and the request should be rejected (429)"""
+
+
+class WorkerPoolTimeout(Exception):
+    """Raised when a queued request waited too long for a free worker (503)"""
+
+
+class WorkerPool:
+    """Runs blocking chatbot calls on a bounded thread pool without blocking the event loop"""
+
+    def __init__(self, max_workers=4, max_queue=16, queue_timeout=30.0):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chatbot-worker")
+        self._slots = None
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on a worker thread, applying the concurrency and queue limits"""
+        # All counters are only touched from the event loop thread, so no lock is needed
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+
+        # Admission is decided before the first await, so bursts cannot overshoot the limit
+        if self.is_saturated():
+            self.rejected += 1
+            raise WorkerPoolSaturated("Too many pending requests")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise WorkerPoolTimeout("Timed out waiting for a free worker")
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._finish(None)
+            raise
+        # The slot is freed when the thread finishes, not when the caller stops waiting: a
+        # disconnected request must not let new work past the cap while its call still runs
+        future.add_done_callback(self._finish)
+        return await asyncio.shield(future)
+
+    def _finish(self, future):
+        self.active -= 1
+        self._slots.release()
+        # Retrieve the exception so it is not reported as lost when nobody awaited the result
+        if future is not None and not future.cancelled():
+            future.exception()
+
+    def free_workers(self):
+        """Workers that are neither busy nor already promised to a queued request"""
+        return max(0, self.max_workers - self.active - self.waiting)
+
+    def is_saturated(self):
+        """True when every worker is busy and the wait queue is full"""
+        return self.active + self.waiting >= self.max_workers + self.max_queue
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
@@ -15,7 +15,16 @@ from modules.ui_components import (
     initialize_chat_history, render_chat_input, show_typing_indicator,
     render_error_message, render_success_message
 )
-from modules.utils import validate_environment, get_language_flag
+from modules.utils import validate_environment, get_language_flag, start_llm_suggestions
+
+
+@st.cache_resource(show_spinner=False)
+def load_chatbot():
+    """Create the chatbot once per process; Streamlit reruns and sessions reuse it"""
+    return APECChatbot(
+        api_key=ChatbotConfig.GOOGLE_API_KEY,
+        persist_directory=ChatbotConfig.VECTOR_DB_PATH
+    )
 
 
 def main():
@@ -32,18 +41,17 @@ def main():
         render_error_message(message)
         st.stop()
     
-    # Initialize chatbot
-    if 'chatbot' not in st.session_state:
-        with st.spinner(SYSTEM_MESSAGES["loading"]):
-            try:
-                st.session_state.chatbot = APECChatbot(
-                    api_key=ChatbotConfig.GOOGLE_API_KEY,
-                    persist_directory=ChatbotConfig.VECTOR_DB_PATH
-                )
-                render_success_message("Chatbot initialized successfully!")
-            except Exception as e:
-                render_error_message(f"Failed to initialize chatbot: {str(e)}")
-                st.stop()
+    # Load the chatbot once per process and share it across browser sessions
+    with st.spinner(SYSTEM_MESSAGES["loading"]):
+        try:
+            chatbot = load_chatbot()
+        except Exception as e:
+            render_error_message(f"Failed to initialize chatbot: {str(e)}")
+            st.stop()
+
+    if 'chatbot_loaded' not in st.session_state:
+        st.session_state.chatbot_loaded = True
+        render_success_message("Chatbot initialized successfully!")
     
     # Render header
     st.markdown(APP_HEADER_HTML, unsafe_allow_html=True)
@@ -71,7 +79,7 @@ def main():
             message["role"] == "assistant" and
             not (suggestion_prompt or chat_input_prompt)  # Don't show if we're processing input
         )
-        render_chat_message(message, show_suggestions=is_last_assistant, llm=st.session_state.chatbot.llm if st.session_state.chatbot else None)
+        render_chat_message(message, show_suggestions=is_last_assistant, llm=chatbot.llm)
 
     # Use suggestion if available, otherwise use chat input
     prompt = suggestion_prompt or chat_input_prompt
@@ -87,27 +95,43 @@ def main():
 
         # Generate and display assistant response
         with st.chat_message("assistant"):
+            start_time = time.time()
+
+            # Stream the response: retrieval metadata arrives first, then answer tokens
+            events = chatbot.stream_query(
+                prompt,
+                top_k=ChatbotConfig.DEFAULT_TOP_K,
+                auto_detect=auto_detect,
+                preferred_language=preferred_language
+            )
             with show_typing_indicator():
-                start_time = time.time()
-
-                # Get response from chatbot
-                response = st.session_state.chatbot.query(
-                    prompt,
-                    top_k=ChatbotConfig.DEFAULT_TOP_K,
-                    auto_detect=auto_detect,
-                    preferred_language=preferred_language,
-                    show_sources=False
-                )
+                first_event = next(events)
 
-                end_time = time.time()
-                response_time = round(end_time - start_time, 2)
+            response = {"answer": "", "sources": [], "num_sources": 0, "detected_language": "en"}
+            if first_event["type"] == "metadata":
+                response.update(first_event)
+            else:
+                response["answer"] = first_event["answer"]
 
             # Show language detection badge
             lang_flag = get_language_flag(response["detected_language"])
             st.markdown(f'<span class="language-badge">{lang_flag} {response["detected_language"].upper()}</span>', unsafe_allow_html=True)
 
-            # Display the answer
-            st.markdown(response["answer"])
+            # Display the answer incrementally as tokens arrive
+            answer_placeholder = st.empty()
+            for event in events:
+                if event["type"] == "token":
+                    response["answer"] += event["content"]
+                    answer_placeholder.markdown(response["answer"] + "▌")
+                elif event["type"] in ("done", "error"):
+                    response["answer"] = event["answer"]
+            answer_placeholder.markdown(response["answer"])
+
+            # Start the LLM follow-up suggestions while the rest of the message renders
+            start_llm_suggestions(response["answer"], response["detected_language"], chatbot.llm)
+
+            end_time = time.time()
+            response_time = round(end_time - start_time, 2)
 
             # Show response metadata
             render_response_metadata(response_time, response["num_sources"], response["sources"])
@@ -129,7 +153,7 @@ def main():
 
             # Show suggestions immediately for the new response
             from modules.ui_components import render_auto_suggestions
-            render_auto_suggestions(new_message, llm=st.session_state.chatbot.llm)
+            render_auto_suggestions(new_message, llm=chatbot.llm)
 
 
 